@@ -1,56 +1,64 @@
 #!/usr/bin/env python3
 """
-Quick script to update a user's plan in Firestore
+Quick script to update one or more users' plans in Firestore
 """
 
 import sys
 import asyncio
 sys.path.insert(0, '/home/elmi/Documents/Projects/Lently/lently-backend')
 
-from src.firebase_init import get_firestore
+from src.firebase_init import get_async_firestore
 from google.cloud.firestore import SERVER_TIMESTAMP
 
+VALID_PLANS = ["free", "starter", "pro", "business"]
 
-async def update_user_plan(user_id: str, plan: str):
-    """Update user plan in Firestore"""
-    db = get_firestore()
-    
-    user_ref = db.collection("users").document(user_id)
-    user_doc = user_ref.get()
-    
-    if not user_doc.exists:
-        print(f"User {user_id} not found!")
-        return
-    
-    current_data = user_doc.to_dict()
-    print(f"Current plan: {current_data.get('plan', 'unknown')}")
-    
-    # Update plan
-    user_ref.update({
-        "plan": plan,
-        "updatedAt": SERVER_TIMESTAMP
-    })
-    
-    print(f"✓ Updated user {user_id} to {plan} plan")
-    
-    # Show updated data
-    updated_doc = user_ref.get()
-    updated_data = updated_doc.to_dict()
-    print(f"New plan: {updated_data.get('plan')}")
+# Firestore caps a single write batch at 500 operations
+BATCH_LIMIT = 500
+
+
+async def update_user_plans(updates: list[tuple[str, str]]):
+    """Update user plans in Firestore using batched reads and writes"""
+    db = get_async_firestore()
+
+    plans = dict(updates)
+    refs = [db.collection("users").document(user_id) for user_id in plans]
+
+    # Fetch every user in one round trip
+    existing = []
+    async for user_doc in db.get_all(refs):
+        if not user_doc.exists:
+            print(f"User {user_doc.id} not found!")
+            continue
+        current_plan = user_doc.to_dict().get("plan", "unknown")
+        print(f"{user_doc.id}: {current_plan} -> {plans[user_doc.id]}")
+        existing.append(user_doc.reference)
+
+    # Write in chunks of at most BATCH_LIMIT updates per commit
+    for i in range(0, len(existing), BATCH_LIMIT):
+        batch = db.batch()
+        for user_ref in existing[i:i + BATCH_LIMIT]:
+            batch.update(user_ref, {
+                "plan": plans[user_ref.id],
+                "updatedAt": SERVER_TIMESTAMP
+            })
+        await batch.commit()
+
+    print(f"✓ Updated {len(existing)} of {len(plans)} users")
 
 
 if __name__ == "__main__":
-    if len(sys.argv) < 3:
-        print("Usage: python update_user_plan.py <user_id> <plan>")
+    args = sys.argv[1:]
+    if not args or len(args) % 2:
+        print("Usage: python update_user_plan.py <user_id> <plan> [<user_id> <plan> ...]")
         print("Plans: free, starter, pro, business")
         sys.exit(1)
-    
-    user_id = sys.argv[1]
-    plan = sys.argv[2].lower()
-    
-    if plan not in ["free", "starter", "pro", "business"]:
-        print(f"Invalid plan: {plan}")
-        print("Valid plans: free, starter, pro, business")
-        sys.exit(1)
-    
-    asyncio.run(update_user_plan(user_id, plan))
+
+    updates = [(user_id, plan.lower()) for user_id, plan in zip(args[::2], args[1::2])]
+
+    for user_id, plan in updates:
+        if plan not in VALID_PLANS:
+            print(f"Invalid plan for {user_id}: {plan}")
+            print("Valid plans: free, starter, pro, business")
+            sys.exit(1)
+
+    asyncio.run(update_user_plans(updates))
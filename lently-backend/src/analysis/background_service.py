@@ -4,22 +4,26 @@ Handles async analysis processing with progress updates
 """
 
 import asyncio
-import json
 import logging
+import time
 import uuid
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timezone
 from typing import Optional
 
+import orjson
+
 from src.youtube.service import get_youtube_service, YouTubeService
 from src.youtube.schemas import FetchCommentsRequest, Comment, VideoMetadata
 from src.youtube.exceptions import (
     VideoNotFoundError, CommentsDisabledError,
     QuotaExceededError, InvalidVideoIdError
 )
-from src.gemini.client import get_gemini_client, GeminiClient
+from src.gemini.client import GeminiClient
+from src.gemini.cached_client import get_cached_gemini_client
 from src.gemini.prompts.analysis import (
-    SENTIMENT_ANALYSIS_PROMPT, CLASSIFICATION_PROMPT,
-    INSIGHTS_PROMPT, SUMMARY_PROMPT
+    SENTIMENT_BATCH_PROMPT, CLASSIFICATION_BATCH_PROMPT,
+    INSIGHTS_PROMPT, SUMMARY_PROMPT, render_comments_prompt
 )
 from src.gemini.exceptions import GeminiError, RateLimitError
 from src.analysis.progress import (
@@ -30,11 +34,14 @@ from src.analysis.schemas import (
     SentimentResult, SentimentSummary, CommentSentiment,
     ClassificationResult, ClassificationSummary, CommentClassification,
     InsightsResult, KeyTheme, ContentIdea, AudienceInsight,
-    ExecutiveSummary, StoredComment
+    ExecutiveSummary, StoredComment, ACTIONABLE_CATEGORIES
 )
-from src.firebase_init import get_firestore
+from src.analysis.dedup import fold_duplicates, fan_out
+from src.analysis.storage import store_comments
+from src.firebase_init import get_async_firestore
 from src.utils.text_sanitizer import sanitize_ai_text, sanitize_priority_actions
-from google.cloud.firestore import SERVER_TIMESTAMP
+from google.api_core import exceptions as google_exceptions
+from google.cloud.firestore import SERVER_TIMESTAMP, AsyncClient, Increment
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +49,26 @@ logger = logging.getLogger(__name__)
 # Gemini can handle ~150 comments per request effectively
 BATCH_SIZE = 75  # Balanced for speed and reliable JSON output
 
+# Max Gemini batch calls in flight per stage (avoids rate limits)
+MAX_CONCURRENT_BATCHES = 3
+
+# Comment text is truncated once per analysis for each consumer
+PROMPT_TEXT_LIMIT = 500    # sent to Gemini
+STORED_TEXT_LIMIT = 1000   # stored for Ask AI
+
+# Placeholder for failures before video metadata is available
+_UNKNOWN_VIDEO = VideoInfo(
+    video_id="unknown",
+    title="Unknown",
+    channel_title="Unknown",
+    view_count=0,
+    comment_count=0,
+    thumbnail_url=""
+)
+
+# Background Firestore writes, referenced here so they aren't garbage collected
+_pending_writes: set[asyncio.Task] = set()
+
 
 class BackgroundAnalysisService:
     """
@@ -52,23 +79,29 @@ class BackgroundAnalysisService:
     def __init__(
         self,
         youtube: YouTubeService = None,
-        gemini: GeminiClient = None
+        gemini: GeminiClient = None,
+        db: AsyncClient = None
     ):
         self.youtube = youtube or get_youtube_service()
-        self.gemini = gemini or get_gemini_client()
+        self.gemini = gemini or get_cached_gemini_client()
+        self.db = db or get_async_firestore()
     
-    def _prepare_comments_json(self, comments: list[Comment]) -> str:
-        """Convert comments to JSON for prompts"""
-        comment_data = []
-        for c in comments:
-            comment_data.append({
+    def _prepare_comment_data(self, comments: list[Comment]) -> list[dict]:
+        """Convert comments to prompt dicts (built once, sliced per batch)"""
+        return [
+            {
                 "id": c.comment_id,
                 "author": c.author,
-                "text": c.text[:500],
+                "text": c.text[:PROMPT_TEXT_LIMIT],
                 "likes": c.like_count,
                 "replies": c.reply_count
-            })
-        return json.dumps(comment_data, indent=2)
+            }
+            for c in comments
+        ]
+    
+    def _prepare_comments_json(self, comment_data: list[dict]) -> str:
+        """Serialize prepared comment dicts for prompts (compact, UTF-8)"""
+        return orjson.dumps(comment_data).decode()
     
     async def run_analysis(
         self,
@@ -85,13 +118,13 @@ class BackgroundAnalysisService:
         Run the complete analysis pipeline with progress updates.
         This method is designed to be run in a background task.
         """
-        created_at = datetime.utcnow()
+        created_at = datetime.now(timezone.utc)
+        started = time.monotonic()
+        video_info: Optional[VideoInfo] = None
         
         try:
             # Step 1: Connect and fetch video metadata
             job.update_step(AnalysisStep.CONNECTING)
-            await asyncio.sleep(0.3)  # Small delay for UI feedback
-            
             job.update_step(AnalysisStep.FETCHING_VIDEO)
             
             # Prepare fetch request
@@ -125,6 +158,14 @@ class BackgroundAnalysisService:
             
             video = fetch_result.video
             comments = fetch_result.comments
+            video_info = VideoInfo(
+                video_id=video.video_id,
+                title=video.title,
+                channel_title=video.channel_title,
+                view_count=video.view_count,
+                comment_count=video.comment_count,
+                thumbnail_url=video.thumbnail_url
+            )
             
             # Update job with video info
             job.update_step(
@@ -141,77 +182,75 @@ class BackgroundAnalysisService:
             # Check if cancelled
             if job.is_cancelled():
                 logger.info(f"[{job.analysis_id}] Analysis cancelled by user")
-                return self._create_failed_response(job.analysis_id, created_at, "Analysis cancelled by user")
+                return self._create_failed_response(job.analysis_id, created_at, "Analysis cancelled by user", video_info)
             
             if len(comments) < 5:
                 job.update_step(AnalysisStep.FAILED, error="Not enough comments (minimum 5)")
                 return AnalysisResponse(
                     analysis_id=job.analysis_id,
-                    video=VideoInfo(
-                        video_id=video.video_id,
-                        title=video.title,
-                        channel_title=video.channel_title,
-                        view_count=video.view_count,
-                        comment_count=video.comment_count,
-                        thumbnail_url=video.thumbnail_url
-                    ),
+                    video=video_info,
                     status=AnalysisStatus.FAILED,
                     created_at=created_at,
                     error="Not enough comments to analyze (minimum 5 required)"
                 )
             
-            # Initialize results
-            sentiment_result = None
-            classification_result = None
-            insights_result = None
             summary_result = None
+            comment_data = self._prepare_comment_data(comments)
             
             # Check if cancelled before AI processing
             if job.is_cancelled():
                 logger.info(f"[{job.analysis_id}] Analysis cancelled by user")
-                return self._create_failed_response(job.analysis_id, created_at, "Analysis cancelled by user")
+                return self._create_failed_response(job.analysis_id, created_at, "Analysis cancelled by user", video_info)
             
-            # Steps 2-3: Run Sentiment + Classification in PARALLEL for speed
+            # Steps 2-4: Sentiment, classification and insights are independent,
+            # so run them in PARALLEL and advance progress as each one finishes
             job.update_step(AnalysisStep.ANALYZING_SENTIMENT)
-            logger.info(f"[{job.analysis_id}] Starting parallel sentiment + classification...")
+            logger.info(f"[{job.analysis_id}] Starting parallel sentiment + classification + insights...")
             
             async def run_sentiment():
                 if include_sentiment:
-                    return await self._analyze_sentiment(comments, video)
+                    return await self._analyze_sentiment(comment_data, video)
                 return None
             
             async def run_classification():
                 if include_classification:
-                    return await self._classify_comments(comments, video)
+                    return await self._classify_comments(comment_data, video)
                 return None
             
-            # Run both in parallel
-            sentiment_result, classification_result = await asyncio.gather(
-                run_sentiment(),
-                run_classification()
-            )
+            async def run_insights():
+                if include_insights:
+                    return await self._extract_insights(comment_data, video)
+                return None
             
-            # Update progress after parallel processing
-            job.update_step(AnalysisStep.CLASSIFYING)
-            logger.info(f"[{job.analysis_id}] Sentiment + classification complete")
+            next_steps = iter((AnalysisStep.CLASSIFYING, AnalysisStep.EXTRACTING_INSIGHTS))
             
-            # Step 4: Extract Insights
-            if include_insights:
-                # Check if cancelled
-                if job.is_cancelled():
-                    logger.info(f"[{job.analysis_id}] Analysis cancelled by user")
-                    return self._create_failed_response(job.analysis_id, created_at, "Analysis cancelled by user")
-                
-                job.update_step(AnalysisStep.EXTRACTING_INSIGHTS)
-                logger.info(f"[{job.analysis_id}] Extracting insights...")
-                insights_result = await self._extract_insights(comments, video)
+            def advance_progress(_task: asyncio.Task):
+                step = next(next_steps, None)
+                if step is not None and not job.is_cancelled():
+                    job.update_step(step)
+            
+            tasks = [
+                asyncio.create_task(run_sentiment()),
+                asyncio.create_task(run_classification()),
+                asyncio.create_task(run_insights()),
+            ]
+            for task in tasks:
+                task.add_done_callback(advance_progress)
+            
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            sentiment_result, classification_result, insights_result = results
+            
+            logger.info(f"[{job.analysis_id}] Sentiment + classification + insights complete")
             
             # Step 5: Generate Summary
             if include_summary and sentiment_result and classification_result:
                 # Check if cancelled
                 if job.is_cancelled():
                     logger.info(f"[{job.analysis_id}] Analysis cancelled by user")
-                    return self._create_failed_response(job.analysis_id, created_at, "Analysis cancelled by user")
+                    return self._create_failed_response(job.analysis_id, created_at, "Analysis cancelled by user", video_info)
                 
                 job.update_step(AnalysisStep.GENERATING_SUMMARY)
                 logger.info(f"[{job.analysis_id}] Generating summary...")
@@ -229,17 +268,10 @@ class BackgroundAnalysisService:
             
             response = AnalysisResponse(
                 analysis_id=job.analysis_id,
-                video=VideoInfo(
-                    video_id=video.video_id,
-                    title=video.title,
-                    channel_title=video.channel_title,
-                    view_count=video.view_count,
-                    comment_count=video.comment_count,
-                    thumbnail_url=video.thumbnail_url
-                ),
+                video=video_info,
                 status=AnalysisStatus.COMPLETED,
                 created_at=created_at,
-                completed_at=datetime.utcnow(),
+                completed_at=datetime.now(timezone.utc),
                 comments_analyzed=len(comments),
                 sentiment=sentiment_result,
                 classification=classification_result,
@@ -248,56 +280,78 @@ class BackgroundAnalysisService:
                 stored_comments=stored_comments
             )
             
-            # Store in Firestore
-            await self._store_analysis(job.user_id, response)
+            # Persist in the background; the result is served from the job
+            # until the write lands, so completion doesn't wait on Firestore
+            job.result = response
+            self._schedule_store(job, response)
             
             # Mark as complete
             job.update_step(AnalysisStep.COMPLETED)
-            logger.info(f"[{job.analysis_id}] Analysis complete!")
+            logger.info(f"[{job.analysis_id}] Analysis complete in {time.monotonic() - started:.1f}s")
             
             return response
             
         except Exception as e:
             logger.error(f"[{job.analysis_id}] Analysis failed: {str(e)}")
             job.update_step(AnalysisStep.FAILED, error=str(e))
-            return self._create_failed_response(job.analysis_id, created_at, str(e))
+            return self._create_failed_response(job.analysis_id, created_at, str(e), video_info)
     
     def _create_failed_response(
-        self, analysis_id: str, created_at: datetime, error: str
+        self,
+        analysis_id: str,
+        created_at: datetime,
+        error: str,
+        video_info: Optional[VideoInfo] = None
     ) -> AnalysisResponse:
         """Create a failed analysis response"""
         return AnalysisResponse(
             analysis_id=analysis_id,
-            video=VideoInfo(
-                video_id="unknown",
-                title="Unknown",
-                channel_title="Unknown",
-                view_count=0,
-                comment_count=0,
-                thumbnail_url=""
-            ),
+            video=video_info or _UNKNOWN_VIDEO,
             status=AnalysisStatus.FAILED,
             created_at=created_at,
             error=error
         )
     
-    async def _store_analysis(self, user_id: str, analysis: AnalysisResponse):
-        """Store analysis result in Firestore"""
+    def _schedule_store(self, job: AnalysisJob, analysis: AnalysisResponse):
+        """Store analysis in a background task tracked until it finishes"""
+        task = asyncio.create_task(self._store_analysis(job.user_id, analysis))
+        _pending_writes.add(task)
+        
+        def on_stored(task: asyncio.Task):
+            _pending_writes.discard(task)
+            # Firestore is the source of truth once stored; if the write
+            # failed, the in-memory result is the only copy left
+            if not task.cancelled() and task.result():
+                job.result = None
+        
+        task.add_done_callback(on_stored)
+    
+    async def _store_analysis(self, user_id: str, analysis: AnalysisResponse) -> bool:
+        """Store analysis result in Firestore, returns whether it was stored"""
         try:
-            db = get_firestore()
+            db = self.db
             
-            # Convert to dict
-            analysis_dict = analysis.model_dump(mode="json")
+            # Convert to dict. Null fields are dropped to keep the document
+            # small; readers already treat missing fields as defaults.
+            analysis_dict = analysis.model_dump(mode="json", exclude_none=True)
             analysis_dict["user_id"] = user_id
             analysis_dict["stored_at"] = SERVER_TIMESTAMP
             
+            # Comments go to a subcollection (keeps the parent doc under the
+            # 1MB limit) and are written first so they exist once it's visible
+            stored_comments = analysis_dict.pop("stored_comments", [])
+            await store_comments(db, analysis.analysis_id, stored_comments)
+            
+            user_ref = db.collection("users").document(user_id)
+            
+            # Write analysis and history entry in one batch
+            batch = db.batch()
+            
             # Store in analyses collection
-            db.collection("analyses").document(analysis.analysis_id).set(analysis_dict)
+            batch.set(db.collection("analyses").document(analysis.analysis_id), analysis_dict)
             
             # Add to user's analysis history
-            db.collection("users").document(user_id).collection("analyses").document(
-                analysis.analysis_id
-            ).set({
+            batch.set(user_ref.collection("analyses").document(analysis.analysis_id), {
                 "analysis_id": analysis.analysis_id,
                 "video_id": analysis.video.video_id,
                 "video_title": analysis.video.title,
@@ -314,22 +368,26 @@ class BackgroundAnalysisService:
                 } if analysis.sentiment else None
             })
             
-            # Increment user usage
-            user_ref = db.collection("users").document(user_id)
-            user_doc = user_ref.get()
-            if user_doc.exists:
-                current_usage = user_doc.to_dict().get("usage", {})
-                videos_analyzed = current_usage.get("videosAnalyzedThisMonth", 0) + 1
-                user_ref.update({
-                    "usage.videosAnalyzedThisMonth": videos_analyzed,
-                    "updatedAt": SERVER_TIMESTAMP
-                })
+            # Increment user usage server-side (no read needed). Kept out of
+            # the batch: users without a profile document aren't given one.
+            async def increment_user_usage():
+                try:
+                    await user_ref.update({
+                        "usage.videosAnalyzedThisMonth": Increment(1),
+                        "updatedAt": SERVER_TIMESTAMP
+                    })
+                except google_exceptions.NotFound:
+                    pass
+            
+            await asyncio.gather(batch.commit(), increment_user_usage())
             
             logger.info(f"Stored analysis {analysis.analysis_id} for user {user_id}")
+            return True
             
         except Exception as e:
             logger.error(f"Failed to store analysis: {e}")
             # Don't fail the whole analysis if storage fails
+            return False
     
     def _build_stored_comments(
         self,
@@ -338,173 +396,151 @@ class BackgroundAnalysisService:
         classification_result: Optional[ClassificationResult]
     ) -> list[StoredComment]:
         """Build stored comments for Ask AI"""
-        sentiment_map = {}
-        if sentiment_result:
-            for cs in sentiment_result.comments:
-                sentiment_map[cs.comment_id] = cs.sentiment
-        
-        classification_map = {}
-        if classification_result:
-            for cc in classification_result.comments:
-                classification_map[cc.comment_id] = cc.primary_category
+        sentiment_map = (
+            {cs.comment_id: cs.sentiment for cs in sentiment_result.comments}
+            if sentiment_result else {}
+        )
+        classification_map = (
+            {cc.comment_id: cc.primary_category for cc in classification_result.comments}
+            if classification_result else {}
+        )
         
-        stored = []
-        for comment in comments:
-            stored.append(StoredComment(
+        return [
+            StoredComment(
                 comment_id=comment.comment_id,
                 author=comment.author,
-                text=comment.text[:1000],
+                text=comment.text[:STORED_TEXT_LIMIT],
                 like_count=comment.like_count,
                 reply_count=comment.reply_count,
                 sentiment=sentiment_map.get(comment.comment_id),
                 category=classification_map.get(comment.comment_id),
                 is_question=comment.is_question,
                 is_feedback=comment.is_feedback
-            ))
-        
-        return stored
+            )
+            for comment in comments
+        ]
     
     async def _analyze_sentiment(
-        self, comments: list[Comment], video: VideoMetadata
+        self, comment_data: list[dict], video: VideoMetadata
     ) -> SentimentResult:
         """Analyze sentiment of comments with concurrent batch processing"""
-        all_comment_sentiments = []
+        # Identical comments are analyzed once, then batched
+        unique, duplicates = fold_duplicates(comment_data, lambda c: c["text"], lambda c: c["id"])
+        batches = [unique[i:i + BATCH_SIZE] for i in range(0, len(unique), BATCH_SIZE)]
         
-        # Create batches
-        batches = [comments[i:i + BATCH_SIZE] for i in range(0, len(comments), BATCH_SIZE)]
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
         
-        async def process_batch(batch: list[Comment], is_last: bool):
-            prompt = SENTIMENT_ANALYSIS_PROMPT.format(
-                video_title=video.title,
-                channel_name=video.channel_title,
-                comments_json=self._prepare_comments_json(batch)
-            )
+        # Video context is fixed for the run, render it once
+        head, tail = render_comments_prompt(
+            SENTIMENT_BATCH_PROMPT,
+            video_title=video.title,
+            channel_name=video.channel_title
+        )
+        
+        async def process_batch(batch: list[dict]) -> list[CommentSentiment]:
+            prompt = head + self._prepare_comments_json(batch) + tail
             try:
-                result = await self.gemini.generate_json(prompt)
-                sentiments = []
-                for cs in result.get("comments", []):
-                    sentiments.append(CommentSentiment(
+                async with semaphore:
+                    result = await self.gemini.generate_json(prompt)
+                return [
+                    CommentSentiment(
                         comment_id=cs["comment_id"],
                         sentiment=cs["sentiment"],
                         confidence=cs.get("confidence", 0.8),
                         emotion=cs.get("emotion")
-                    ))
-                summary_data = result.get("summary") if is_last else None
-                return sentiments, summary_data
+                    )
+                    for cs in result.get("comments", [])
+                ]
             except GeminiError as e:
                 logger.warning(f"Sentiment batch failed: {e}")
-                return [], None
-        
-        # Process batches concurrently (max 3 concurrent to avoid rate limits)
-        results = []
-        for i in range(0, len(batches), 3):
-            chunk = batches[i:i+3]
-            chunk_results = await asyncio.gather(*[
-                process_batch(batch, i + j == len(batches) - 1) 
-                for j, batch in enumerate(chunk)
-            ])
-            results.extend(chunk_results)
+                return []
         
-        # Collect all results
-        summary = None
-        for sentiments, summary_data in results:
-            all_comment_sentiments.extend(sentiments)
-            if summary_data:
-                summary = SentimentSummary(
-                    positive_percentage=summary_data.get("positive_percentage", 0),
-                    negative_percentage=summary_data.get("negative_percentage", 0),
-                    neutral_percentage=summary_data.get("neutral_percentage", 0),
-                    mixed_percentage=summary_data.get("mixed_percentage", 0),
-                    dominant_sentiment=summary_data.get("dominant_sentiment", "neutral"),
-                    top_emotions=summary_data.get("top_emotions", []),
-                    sentiment_trend=summary_data.get("sentiment_trend")
-                )
+        # Process batches concurrently; the semaphore keeps a sliding window
+        # of in-flight requests instead of waiting for each wave to finish
+        results = await asyncio.gather(*[process_batch(batch) for batch in batches])
+        all_comment_sentiments = fan_out(
+            [s for sentiments in results for s in sentiments], duplicates
+        )
         
-        if summary is None:
-            if all_comment_sentiments:
-                total = len(all_comment_sentiments)
-                pos = sum(1 for s in all_comment_sentiments if s.sentiment == "positive")
-                neg = sum(1 for s in all_comment_sentiments if s.sentiment == "negative")
-                neu = sum(1 for s in all_comment_sentiments if s.sentiment == "neutral")
-                mix = sum(1 for s in all_comment_sentiments if s.sentiment == "mixed")
-                
-                summary = SentimentSummary(
-                    positive_percentage=round(pos / total * 100, 1),
-                    negative_percentage=round(neg / total * 100, 1),
-                    neutral_percentage=round(neu / total * 100, 1),
-                    mixed_percentage=round(mix / total * 100, 1),
-                    dominant_sentiment=max(
-                        [("positive", pos), ("negative", neg), ("neutral", neu), ("mixed", mix)],
-                        key=lambda x: x[1]
-                    )[0],
-                    top_emotions=[],
-                    sentiment_trend=None
-                )
-            else:
-                summary = SentimentSummary(
-                    positive_percentage=0,
-                    negative_percentage=0,
-                    neutral_percentage=100,
-                    mixed_percentage=0,
-                    dominant_sentiment="neutral",
-                    top_emotions=[],
-                    sentiment_trend=None
-                )
+        # Summary is aggregated from the per-comment labels of every batch
+        if all_comment_sentiments:
+            total = len(all_comment_sentiments)
+            counts = Counter(s.sentiment for s in all_comment_sentiments)
+            emotions = Counter(s.emotion for s in all_comment_sentiments if s.emotion)
+            
+            summary = SentimentSummary(
+                positive_percentage=round(counts["positive"] / total * 100, 1),
+                negative_percentage=round(counts["negative"] / total * 100, 1),
+                neutral_percentage=round(counts["neutral"] / total * 100, 1),
+                mixed_percentage=round(counts["mixed"] / total * 100, 1),
+                # Ties resolve in this order
+                dominant_sentiment=max(
+                    ("positive", "negative", "neutral", "mixed"),
+                    key=counts.__getitem__
+                ),
+                top_emotions=[emotion for emotion, _ in emotions.most_common(3)],
+                sentiment_trend=None
+            )
+        else:
+            summary = SentimentSummary(
+                positive_percentage=0,
+                negative_percentage=0,
+                neutral_percentage=100,
+                mixed_percentage=0,
+                dominant_sentiment="neutral",
+                top_emotions=[],
+                sentiment_trend=None
+            )
         
         return SentimentResult(comments=all_comment_sentiments, summary=summary)
     
     async def _classify_comments(
-        self, comments: list[Comment], video: VideoMetadata
+        self, comment_data: list[dict], video: VideoMetadata
     ) -> ClassificationResult:
         """Classify comments into categories with concurrent batch processing"""
-        all_classifications = []
-        category_counts = {}
+        # Identical comments are classified once, then batched
+        unique, duplicates = fold_duplicates(comment_data, lambda c: c["text"], lambda c: c["id"])
+        batches = [unique[i:i + BATCH_SIZE] for i in range(0, len(unique), BATCH_SIZE)]
+        
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
         
-        # Prepare all batches
-        batches = [comments[i:i + BATCH_SIZE] for i in range(0, len(comments), BATCH_SIZE)]
+        # Video context is fixed for the run, render it once
+        head, tail = render_comments_prompt(
+            CLASSIFICATION_BATCH_PROMPT,
+            video_title=video.title,
+            channel_name=video.channel_title
+        )
         
-        async def process_batch(batch: list[Comment]) -> list[CommentClassification]:
+        async def process_batch(batch: list[dict]) -> list[CommentClassification]:
             """Process a single batch and return classifications"""
-            prompt = CLASSIFICATION_PROMPT.format(
-                video_title=video.title,
-                channel_name=video.channel_title,
-                comments_json=self._prepare_comments_json(batch)
-            )
+            prompt = head + self._prepare_comments_json(batch) + tail
             
             try:
-                result = await self.gemini.generate_json(prompt)
-                batch_classifications = []
-                
-                for cc in result.get("comments", []):
-                    classification = CommentClassification(
+                async with semaphore:
+                    result = await self.gemini.generate_json(prompt)
+                return [
+                    CommentClassification(
                         comment_id=cc["comment_id"],
                         primary_category=cc["primary_category"],
                         secondary_category=cc.get("secondary_category"),
                         confidence=cc.get("confidence", 0.8)
                     )
-                    batch_classifications.append(classification)
-                
-                return batch_classifications
+                    for cc in result.get("comments", [])
+                ]
             except GeminiError as e:
                 logger.warning(f"Classification batch failed: {e}")
                 return []
         
-        # Process batches concurrently (max 3 concurrent to avoid rate limits)
-        for i in range(0, len(batches), 3):
-            chunk = batches[i:i+3]
-            chunk_results = await asyncio.gather(*[process_batch(batch) for batch in chunk])
-            
-            for batch_classifications in chunk_results:
-                for classification in batch_classifications:
-                    all_classifications.append(classification)
-                    cat = classification.primary_category
-                    category_counts[cat] = category_counts.get(cat, 0) + 1
+        # Process batches concurrently, bounded by the semaphore
+        batch_results = await asyncio.gather(*[process_batch(batch) for batch in batches])
+        
+        all_classifications = fan_out([c for batch in batch_results for c in batch], duplicates)
+        category_counts = dict(Counter(c.primary_category for c in all_classifications))
         
         total = len(all_classifications) or 1
         category_percentages = {k: round(v / total * 100, 1) for k, v in category_counts.items()}
         
-        actionable_categories = ["question", "suggestion", "request", "feedback"]
-        actionable_count = sum(category_counts.get(cat, 0) for cat in actionable_categories)
+        actionable_count = sum(category_counts.get(cat, 0) for cat in ACTIONABLE_CATEGORIES)
         
         top_category = max(category_counts.items(), key=lambda x: x[1])[0] if category_counts else "other"
         
@@ -519,10 +555,10 @@ class BackgroundAnalysisService:
         )
     
     async def _extract_insights(
-        self, comments: list[Comment], video: VideoMetadata
+        self, comment_data: list[dict], video: VideoMetadata
     ) -> InsightsResult:
         """Extract themes, content ideas, and audience insights"""
-        sample_comments = comments[:min(len(comments), 75)]
+        sample_comments = comment_data[:75]
         
         prompt = INSIGHTS_PROMPT.format(
             video_title=video.title,
@@ -588,22 +624,22 @@ class BackgroundAnalysisService:
             view_count=video.view_count,
             total_comments=video.comment_count,
             analyzed_count=comments_count,
-            sentiment_json=json.dumps({
+            sentiment_json=orjson.dumps({
                 "positive": sentiment.summary.positive_percentage,
                 "negative": sentiment.summary.negative_percentage,
                 "neutral": sentiment.summary.neutral_percentage,
                 "dominant": sentiment.summary.dominant_sentiment,
                 "top_emotions": sentiment.summary.top_emotions
-            }),
-            classification_json=json.dumps({
+            }).decode(),
+            classification_json=orjson.dumps({
                 "counts": classification.summary.category_counts,
                 "top_category": classification.summary.top_category,
                 "actionable_count": classification.summary.actionable_count
-            }),
-            themes_json=json.dumps([
+            }).decode(),
+            themes_json=orjson.dumps([
                 {"theme": t.theme, "mentions": t.mention_count}
                 for t in (insights.key_themes if insights else [])
-            ])
+            ]).decode()
         )
         
         try:
@@ -630,6 +666,13 @@ class BackgroundAnalysisService:
             )
 
 
+async def flush_pending_writes():
+    """Wait for in-flight analysis writes (called on shutdown)"""
+    if _pending_writes:
+        logger.info(f"Waiting for {len(_pending_writes)} pending analysis writes...")
+        await asyncio.gather(*_pending_writes, return_exceptions=True)
+
+
 # Singleton
 _background_service: Optional[BackgroundAnalysisService] = None
 
@@ -5,16 +5,46 @@ Analysis Service with Redis Caching
 Wraps analysis service to provide caching for analysis results.
 """
 
+import asyncio
 import logging
+import time
+from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
 
 from .service import AnalysisService, get_analysis_service
 from .schemas import AnalysisRequest, AnalysisResponse, AnalysisStatus
-from ..cache import CacheService, get_cache_service, CacheKeys, CacheTTL
+from .storage import with_stored_comments
+from ..cache import CacheService, get_cache_service, CacheKeys, LocalTTLCache
+from ..firebase_init import get_async_firestore
 
 logger = logging.getLogger(__name__)
 
+# In-process cache for analyses polled repeatedly by the same worker
+LOCAL_CACHE_SIZE = 1024
+LOCAL_CACHE_TTL = 30
+
+# How long a Redis miss is remembered locally, so polling an uncached ID skips Redis
+NEGATIVE_CACHE_TTL = 5
+
+# Past this fraction of its TTL, a hit is served but refreshed in the background
+SOFT_REFRESH_RATIO = 0.8
+
+
+@dataclass(frozen=True)
+class AnalysisCacheConfig:
+    """
+    TTLs for cached analyses, chosen by how likely the result is to change.
+    
+    Completed analyses never change, so they are kept long; failed and
+    in-progress ones are expected to be retried or updated soon.
+    """
+    completed_ttl: int = 24 * 3600
+    failed_ttl: int = 300
+    in_progress_ttl: int = 60
+    min_ttl: int = 30
+    max_ttl: int = 7 * 24 * 3600
+
 
 class CachedAnalysisService:
     """
@@ -29,7 +59,8 @@ class CachedAnalysisService:
     def __init__(
         self,
         analysis_service: Optional[AnalysisService] = None,
-        cache_service: Optional[CacheService] = None
+        cache_service: Optional[CacheService] = None,
+        ttl_config: Optional[AnalysisCacheConfig] = None
     ):
         """
         Initialize cached analysis service.
@@ -37,17 +68,99 @@ class CachedAnalysisService:
         Args:
             analysis_service: Core analysis service
             cache_service: Redis cache service
+            ttl_config: TTLs per analysis status (defaults to AnalysisCacheConfig())
         """
         self.analysis = analysis_service
         self.cache = cache_service
+        self.ttl_config = ttl_config or AnalysisCacheConfig()
+        self._local = LocalTTLCache(maxsize=LOCAL_CACHE_SIZE, ttl=LOCAL_CACHE_TTL)
+        self._misses = LocalTTLCache(maxsize=LOCAL_CACHE_SIZE, ttl=NEGATIVE_CACHE_TTL)
+        # One in-flight background refresh per analysis
+        self._refreshing: dict[str, asyncio.Task] = {}
     
     async def _get_services(self):
         """Lazy initialize services"""
         if self.analysis is None:
-            self.analysis = await get_analysis_service()
+            self.analysis = get_analysis_service()
         if self.cache is None:
             self.cache = await get_cache_service()
     
+    def _compute_ttl(self, analysis_data: dict) -> int:
+        """
+        Pick a TTL from the analysis status.
+        
+        Args:
+            analysis_data: Analysis response dict
+        
+        Returns:
+            TTL in seconds, clamped to the configured bounds
+        """
+        config = self.ttl_config
+        status = analysis_data.get("status")
+        
+        if status == AnalysisStatus.COMPLETED.value:
+            ttl = config.completed_ttl
+        elif status == AnalysisStatus.FAILED.value:
+            ttl = config.failed_ttl
+        else:
+            ttl = config.in_progress_ttl
+        
+        return max(config.min_ttl, min(ttl, config.max_ttl))
+    
+    @staticmethod
+    def _wrap(analysis_data: dict, ttl: int) -> dict:
+        """Store the write time and TTL alongside the payload"""
+        return {"v": analysis_data, "cached_at": time.time(), "ttl": ttl}
+    
+    @staticmethod
+    def _unwrap(cached: dict) -> tuple[dict, Optional[float]]:
+        """
+        Split a cached entry into payload and age.
+        
+        Args:
+            cached: Entry as read from Redis
+        
+        Returns:
+            (analysis dict, fraction of its TTL used) - the fraction is
+            None for entries written before the envelope was introduced
+        """
+        if isinstance(cached, dict) and "v" in cached and "cached_at" in cached:
+            ttl = cached.get("ttl") or 0
+            used = (time.time() - cached["cached_at"]) / ttl if ttl > 0 else None
+            return cached["v"], used
+        return cached, None
+    
+    async def _load_analysis(self, analysis_id: str) -> Optional[dict]:
+        """Read an analysis (with its stored comments) from Firestore"""
+        db = get_async_firestore()
+        doc = await db.collection("analyses").document(analysis_id).get()
+        if not doc.exists:
+            return None
+        return await with_stored_comments(db, analysis_id, doc.to_dict())
+    
+    async def _refresh(self, analysis_id: str):
+        """Reload an analysis from Firestore and re-cache it"""
+        try:
+            analysis_data = await self._load_analysis(analysis_id)
+            if analysis_data is None:
+                return
+            await self.cache_analysis(
+                analysis_id,
+                analysis_data,
+                user_id=analysis_data.get("user_id")
+            )
+            logger.info("🔄 Refreshed cached analysis %s", analysis_id)
+        except Exception as e:
+            logger.warning("⚠️ Background refresh failed for analysis %s: %s", analysis_id, e)
+    
+    def _schedule_refresh(self, analysis_id: str):
+        """Start a background refresh unless one is already running"""
+        if analysis_id in self._refreshing:
+            return
+        task = asyncio.create_task(self._refresh(analysis_id))
+        self._refreshing[analysis_id] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(analysis_id, None))
+    
     async def get_cached_analysis(
         self,
         analysis_id: str
@@ -55,21 +168,38 @@ class CachedAnalysisService:
         """
         Get analysis from cache.
         
+        Checks the in-process cache before Redis. Entries close to
+        expiry are still returned, while a single background refresh
+        reloads them so pollers never all miss at once.
+        Misses are remembered for a few seconds, so polling an ID that
+        isn't cached yet doesn't hit Redis on every call.
+        
         Args:
             analysis_id: Analysis ID
         
         Returns:
             Cached analysis dict or None
         """
+        cached = self._local.get(analysis_id)
+        if cached is not None:
+            return cached
+        if self._misses.get(analysis_id):
+            return None
+        
         await self._get_services()
         
         cache_key = CacheKeys.analysis(analysis_id)
         cached = await self.cache.get(cache_key)
         
         if cached:
-            logger.info(f"✅ Cache HIT: Analysis {analysis_id}")
+            cached, used = self._unwrap(cached)
+            if used is not None and used > SOFT_REFRESH_RATIO:
+                self._schedule_refresh(analysis_id)
+            self._local.set(analysis_id, cached)
+            logger.info("✅ Cache HIT: Analysis %s", analysis_id)
         else:
-            logger.info(f"❌ Cache MISS: Analysis {analysis_id}")
+            self._misses.set(analysis_id, True)
+            logger.info("❌ Cache MISS: Analysis %s", analysis_id)
         
         return cached
     
@@ -77,7 +207,8 @@ class CachedAnalysisService:
         self,
         analysis_id: str,
         analysis_data: dict,
-        ttl: int = CacheTTL.ANALYSIS
+        ttl: Optional[int] = None,
+        user_id: Optional[str] = None
     ) -> bool:
         """
         Store analysis in cache.
@@ -85,18 +216,70 @@ class CachedAnalysisService:
         Args:
             analysis_id: Analysis ID
             analysis_data: Complete analysis response dict
-            ttl: Time to live (default: 1 hour)
+            ttl: Time to live (default: based on the analysis status)
+            user_id: Owner; when given, the entry is added to the user's
+                index so invalidate_user_analyses can find it
         
         Returns:
             True if cached successfully
         """
+        if user_id:
+            return await self.cache_analysis_bundle(analysis_id, user_id, analysis_data, ttl)
+        
         await self._get_services()
         
+        if ttl is None:
+            ttl = self._compute_ttl(analysis_data)
+        
         cache_key = CacheKeys.analysis(analysis_id)
-        success = await self.cache.set(cache_key, analysis_data, ttl=ttl)
+        success = await self.cache.set(cache_key, self._wrap(analysis_data, ttl), ttl=ttl)
+        
+        if success:
+            self._misses.pop(analysis_id)
+            self._local.set(analysis_id, analysis_data)
+            logger.info("📦 Cached analysis %s (TTL: %ss)", analysis_id, ttl)
+        
+        return success
+    
+    async def cache_analysis_bundle(
+        self,
+        analysis_id: str,
+        user_id: str,
+        analysis_data: dict,
+        ttl: Optional[int] = None
+    ) -> bool:
+        """
+        Store analysis in cache and index it under its owner.
+        
+        The payload, the user index entry and the index TTL are written
+        in a single pipelined round trip.
+        
+        Args:
+            analysis_id: Analysis ID
+            user_id: Firebase user ID owning the analysis
+            analysis_data: Complete analysis response dict
+            ttl: Time to live (default: based on the analysis status)
+        
+        Returns:
+            True if cached successfully
+        """
+        await self._get_services()
+        
+        if ttl is None:
+            ttl = self._compute_ttl(analysis_data)
+        
+        success = await self.cache.set_indexed(
+            CacheKeys.analysis(analysis_id),
+            self._wrap(analysis_data, ttl),
+            index_key=CacheKeys.user_analyses(user_id),
+            member=analysis_id,
+            ttl=ttl
+        )
         
         if success:
-            logger.info(f"📦 Cached analysis {analysis_id} (TTL: {ttl}s)")
+            self._misses.pop(analysis_id)
+            self._local.set(analysis_id, analysis_data)
+            logger.info("📦 Cached analysis %s for user %s (TTL: %ss)", analysis_id, user_id, ttl)
         
         return success
     
@@ -113,6 +296,7 @@ class CachedAnalysisService:
         Returns:
             True if deleted
         """
+        self._local.pop(analysis_id)
         await self._get_services()
         
         cache_key = CacheKeys.analysis(analysis_id)
@@ -125,6 +309,9 @@ class CachedAnalysisService:
         """
         Invalidate all cached analyses for a user.
         
+        Uses the user's analysis index set, so the cost is proportional
+        to the user's own entries rather than a SCAN of the keyspace.
+        
         Args:
             user_id: Firebase user ID
         
@@ -133,11 +320,19 @@ class CachedAnalysisService:
         """
         await self._get_services()
         
-        return await self.cache.invalidate_user(user_id)
+        # Entries aren't tracked by owner locally, so drop the whole L1
+        self._local.clear()
+        count = await self.cache.invalidate_index(
+            CacheKeys.user_analyses(user_id),
+            CacheKeys.analysis
+        )
+        logger.info("Invalidated %d cached analyses for user %s", count, user_id)
+        return count
 
 
 # Singleton instance
 _cached_analysis_service: Optional[CachedAnalysisService] = None
+_init_lock: Optional[asyncio.Lock] = None
 
 
 async def get_cached_analysis_service() -> CachedAnalysisService:
@@ -147,14 +342,20 @@ async def get_cached_analysis_service() -> CachedAnalysisService:
     Returns:
         CachedAnalysisService instance
     """
-    global _cached_analysis_service
-    
-    if _cached_analysis_service is None:
-        analysis_service = await get_analysis_service()
-        cache_service = await get_cache_service()
-        _cached_analysis_service = CachedAnalysisService(
-            analysis_service,
-            cache_service
-        )
+    global _cached_analysis_service, _init_lock
+    
+    if _cached_analysis_service is not None:
+        return _cached_analysis_service
+    
+    # Concurrent first callers wait here instead of each building the services
+    _init_lock = _init_lock or asyncio.Lock()
+    async with _init_lock:
+        if _cached_analysis_service is None:
+            analysis_service = get_analysis_service()
+            cache_service = await get_cache_service()
+            _cached_analysis_service = CachedAnalysisService(
+                analysis_service,
+                cache_service
+            )
     
     return _cached_analysis_service
@@ -0,0 +1,47 @@
+"""
+Duplicate Comment Folding
+Identical comments ("First!", emoji chains, copy-pasted spam) are sent to
+Gemini once and the label is copied to every duplicate.
+"""
+
+from typing import Callable, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+L = TypeVar("L", bound=BaseModel)
+
+
+def fold_duplicates(
+    items: list[T],
+    text: Callable[[T], str],
+    comment_id: Callable[[T], str]
+) -> tuple[list[T], dict[str, list[str]]]:
+    """
+    Keep the first comment for each normalized text.
+
+    Returns the kept comments and, for each kept comment ID, the IDs of
+    the comments folded into it.
+    """
+    kept: dict[str, T] = {}
+    duplicates: dict[str, list[str]] = {}
+    for item in items:
+        key = text(item).strip().lower()
+        first = kept.get(key)
+        if first is None:
+            kept[key] = item
+        else:
+            duplicates.setdefault(comment_id(first), []).append(comment_id(item))
+    return list(kept.values()), duplicates
+
+
+def fan_out(labels: list[L], duplicates: dict[str, list[str]]) -> list[L]:
+    """Copy each label (anything with a comment_id) to the comments folded into it"""
+    if not duplicates:
+        return labels
+    result = []
+    for label in labels:
+        result.append(label)
+        for duplicate_id in duplicates.get(label.comment_id, ()):
+            result.append(label.model_copy(update={"comment_id": duplicate_id}))
+    return result
@@ -5,10 +5,15 @@ Handles real-time progress tracking for analysis jobs
 
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Optional, Callable, Awaitable
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Optional, Callable, Awaitable, AsyncIterator
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, PrivateAttr
+
+from src.analysis.schemas import AnalysisResponse
 
 logger = logging.getLogger(__name__)
 
@@ -42,6 +47,36 @@ STEP_WEIGHTS = {
     AnalysisStep.COMPLETED: 3,
 }
 
+# Human-readable labels shown in the progress UI
+STEP_LABELS = {
+    AnalysisStep.QUEUED: "Queued",
+    AnalysisStep.CONNECTING: "Connecting to YouTube",
+    AnalysisStep.FETCHING_VIDEO: "Fetching video metadata",
+    AnalysisStep.FETCHING_COMMENTS: "Selecting quality comments",
+    AnalysisStep.ANALYZING_SENTIMENT: "Analyzing sentiment",
+    AnalysisStep.CLASSIFYING: "Categorizing comments",
+    AnalysisStep.EXTRACTING_INSIGHTS: "Extracting insights",
+    AnalysisStep.GENERATING_SUMMARY: "Generating summary",
+    AnalysisStep.SAVING: "Saving results",
+    AnalysisStep.COMPLETED: "Analysis complete",
+    AnalysisStep.FAILED: "Analysis failed",
+}
+
+# Steps after which a job never changes again (str enum, so plain values match too)
+TERMINAL_STEPS = frozenset({AnalysisStep.COMPLETED, AnalysisStep.FAILED})
+
+# Minimum interval between published updates for non-terminal steps (seconds)
+NOTIFY_INTERVAL = 0.1
+
+# Progress at the start of each step = sum of the weights of all earlier steps.
+# Built once so calculate_progress is a single lookup.
+_STEP_START_PROGRESS: dict[AnalysisStep, int] = {}
+_completed_weight = 0
+for _step in AnalysisStep:
+    _STEP_START_PROGRESS[_step] = _completed_weight
+    _completed_weight += STEP_WEIGHTS.get(_step, 0)
+del _step, _completed_weight
+
 
 class ProgressUpdate(BaseModel):
     """Progress update data"""
@@ -57,11 +92,24 @@ class ProgressUpdate(BaseModel):
     video_thumbnail: Optional[str] = None
     error: Optional[str] = None
     completed_at: Optional[datetime] = None
+    
+    # Encoded SSE frame, filled on first send. Snapshots are never mutated
+    # after publishing, so every listener can share the same bytes.
+    _frame: Optional[bytes] = PrivateAttr(default=None)
 
 
 class AnalysisJob:
     """Represents an in-progress analysis job"""
     
+    # Many jobs can be alive at once; slots avoid a per-instance __dict__
+    __slots__ = (
+        "analysis_id", "user_id", "video_url", "status", "step", "progress",
+        "comments_fetched", "total_comments", "video_id", "video_title",
+        "video_thumbnail", "error", "created_at", "_created_at_mono",
+        "completed_at", "result", "_latest", "_frozen_update", "_version",
+        "_changed", "_last_notify", "_pending_notify", "_loop", "_on_finished",
+    )
+    
     def __init__(self, analysis_id: str, user_id: str, video_url: str):
         self.analysis_id = analysis_id
         self.user_id = user_id
@@ -75,26 +123,30 @@ class AnalysisJob:
         self.video_title: Optional[str] = None
         self.video_thumbnail: Optional[str] = None
         self.error: Optional[str] = None
-        self.created_at = datetime.utcnow()
+        self.created_at = datetime.now(timezone.utc)
+        self._created_at_mono = time.monotonic_ns()  # for cheap ordering
         self.completed_at: Optional[datetime] = None
-        self._subscribers: list[asyncio.Queue] = []
+        # Completed result, served from memory until it has been persisted
+        self.result: Optional[AnalysisResponse] = None
+        # Latest snapshot + change notification shared by all listeners
+        self._latest: Optional[ProgressUpdate] = None
+        # Final snapshot of a completed/failed job; it no longer changes
+        self._frozen_update: Optional[ProgressUpdate] = None
+        self._version = 0
+        self._changed = asyncio.Event()
+        self._last_notify = 0.0
+        self._pending_notify: Optional[asyncio.TimerHandle] = None
+        # Loop the listeners run on, so updates from other threads can be handed over
+        try:
+            self._loop: Optional[asyncio.AbstractEventLoop] = asyncio.get_running_loop()
+        except RuntimeError:
+            self._loop = None
+        # Called once when the job turns completed/failed (set by ProgressManager)
+        self._on_finished: Optional[Callable[["AnalysisJob"], None]] = None
     
     def get_step_label(self) -> str:
         """Get human-readable step label"""
-        labels = {
-            AnalysisStep.QUEUED: "Queued",
-            AnalysisStep.CONNECTING: "Connecting to YouTube",
-            AnalysisStep.FETCHING_VIDEO: "Fetching video metadata",
-            AnalysisStep.FETCHING_COMMENTS: "Selecting quality comments",
-            AnalysisStep.ANALYZING_SENTIMENT: "Analyzing sentiment",
-            AnalysisStep.CLASSIFYING: "Categorizing comments",
-            AnalysisStep.EXTRACTING_INSIGHTS: "Extracting insights",
-            AnalysisStep.GENERATING_SUMMARY: "Generating summary",
-            AnalysisStep.SAVING: "Saving results",
-            AnalysisStep.COMPLETED: "Analysis complete",
-            AnalysisStep.FAILED: "Analysis failed",
-        }
-        return labels.get(self.step, "Processing")
+        return STEP_LABELS.get(self.step, "Processing")
     
     def calculate_progress(self) -> int:
         """Calculate overall progress percentage"""
@@ -103,13 +155,8 @@ class AnalysisJob:
         if self.step == AnalysisStep.COMPLETED:
             return 100
         
-        # Sum weights of completed steps
-        completed_weight = 0
-        for step, weight in STEP_WEIGHTS.items():
-            if list(AnalysisStep).index(step) < list(AnalysisStep).index(self.step):
-                completed_weight += weight
-        
-        return min(completed_weight, 97)  # Never show 100 until truly complete
+        # Weights of completed steps, precomputed per step
+        return min(_STEP_START_PROGRESS[self.step], 97)  # Never show 100 until truly complete
     
     def update_step(
         self,
@@ -122,6 +169,19 @@ class AnalysisJob:
         error: str = None
     ):
         """Update job step and notify subscribers"""
+        if (
+            step == self.step
+            and error is None
+            and comments_fetched in (None, self.comments_fetched)
+            and total_comments in (None, self.total_comments)
+            and video_id in (None, self.video_id)
+            and video_title in (None, self.video_title)
+            and video_thumbnail in (None, self.video_thumbnail)
+        ):
+            return  # Nothing observable changed
+        
+        was_processing = self.status == "processing"
+        self._frozen_update = None
         self.step = step
         
         if comments_fetched is not None:
@@ -140,23 +200,61 @@ class AnalysisJob:
         
         if step == AnalysisStep.COMPLETED:
             self.status = "completed"
-            self.completed_at = datetime.utcnow()
+            self.completed_at = datetime.now(timezone.utc)
         elif step == AnalysisStep.FAILED:
             self.status = "failed"
         
         self.progress = self.calculate_progress()
+        if step in TERMINAL_STEPS:
+            self._frozen_update = self.get_progress()
+        if was_processing and self.status != "processing" and self._on_finished:
+            self._on_finished(self)
+        self._notify()
+    
+    def _notify(self):
+        """Publish now, or coalesce into one deferred publish if updates are chatty"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
         
-        # Notify all subscribers
-        update = self.get_progress()
-        for queue in self._subscribers:
-            try:
-                queue.put_nowait(update)
-            except asyncio.QueueFull:
-                pass
+        if loop is None or loop is not self._loop:
+            if self._loop is not None and self._loop.is_running():
+                # Called off the job's loop thread: asyncio.Event isn't thread-safe
+                self._loop.call_soon_threadsafe(self._notify)
+            else:
+                self._publish()
+            return
+        
+        since_last = loop.time() - self._last_notify
+        if self.step in TERMINAL_STEPS or since_last >= NOTIFY_INTERVAL:
+            self._publish()
+        elif self._pending_notify is None:
+            self._pending_notify = loop.call_later(NOTIFY_INTERVAL - since_last, self._publish)
+    
+    def _publish(self):
+        """Publish the snapshot and wake every listener at once (O(1))"""
+        if self._pending_notify is not None:
+            self._pending_notify.cancel()
+            self._pending_notify = None
+        try:
+            self._last_notify = asyncio.get_running_loop().time()
+        except RuntimeError:
+            pass
+        
+        self._latest = self.get_progress()
+        self._version += 1
+        # A fresh event per publish: a listener whose wait hasn't started yet
+        # still holds the old one, which stays set, so the wakeup isn't lost
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
     
     def get_progress(self) -> ProgressUpdate:
         """Get current progress update"""
-        return ProgressUpdate(
+        if self._frozen_update is not None:
+            return self._frozen_update
+        # Built from trusted in-process state, so skip validation
+        return ProgressUpdate.model_construct(
             analysis_id=self.analysis_id,
             status=self.status,
             step=self.step.value,
@@ -172,23 +270,33 @@ class AnalysisJob:
         )
     
     def get_current_update(self) -> ProgressUpdate:
-        """Alias for get_progress for compatibility"""
-        return self.get_progress()
+        """Latest published snapshot (or a fresh one before any update)"""
+        return self._latest or self.get_progress()
     
     def is_cancelled(self) -> bool:
         """Check if the job has been cancelled"""
         return self.status == "failed" and self.step == AnalysisStep.FAILED
     
-    def subscribe(self) -> asyncio.Queue:
-        """Subscribe to progress updates"""
-        queue = asyncio.Queue(maxsize=50)
-        self._subscribers.append(queue)
-        return queue
-    
-    def unsubscribe(self, queue: asyncio.Queue):
-        """Unsubscribe from progress updates"""
-        if queue in self._subscribers:
-            self._subscribers.remove(queue)
+    async def updates(self, keepalive: float = 30.0) -> AsyncIterator[Optional[ProgressUpdate]]:
+        """
+        Yield the current snapshot, then the latest one each time the job changes.
+        
+        Slow listeners skip straight to the newest state instead of
+        dropping updates, so the terminal update is never lost. Yields
+        None when nothing changed for `keepalive` seconds.
+        """
+        seen = None
+        while True:
+            # Take the event before checking the version (see _publish)
+            changed = self._changed
+            if seen == self._version:
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+            seen = self._version
+            yield self.get_current_update()
 
 
 class ProgressManager:
@@ -199,20 +307,21 @@ class ProgressManager:
     
     def __init__(self):
         self._jobs: dict[str, AnalysisJob] = {}
-        self._user_jobs: dict[str, list[str]] = {}  # user_id -> [analysis_ids]
+        self._user_jobs: dict[str, set[str]] = {}  # user_id -> {analysis_ids}
+        # (finished monotonic time, analysis_id), oldest first
+        self._finished: deque[tuple[float, str]] = deque()
         self._cleanup_task: Optional[asyncio.Task] = None
     
     def create_job(self, analysis_id: str, user_id: str, video_url: str) -> AnalysisJob:
         """Create a new analysis job"""
         job = AnalysisJob(analysis_id, user_id, video_url)
+        job._on_finished = self._mark_finished
         self._jobs[analysis_id] = job
         
         # Track by user
-        if user_id not in self._user_jobs:
-            self._user_jobs[user_id] = []
-        self._user_jobs[user_id].append(analysis_id)
+        self._user_jobs.setdefault(user_id, set()).add(analysis_id)
         
-        logger.info(f"Created job {analysis_id} for user {user_id}")
+        logger.info("Created job %s for user %s", analysis_id, user_id)
         return job
     
     def get_job(self, analysis_id: str) -> Optional[AnalysisJob]:
@@ -221,7 +330,7 @@ class ProgressManager:
     
     def get_user_jobs(self, user_id: str) -> list[AnalysisJob]:
         """Get all active jobs for a user"""
-        job_ids = self._user_jobs.get(user_id, [])
+        job_ids = self._user_jobs.get(user_id, ())
         return [self._jobs[jid] for jid in job_ids if jid in self._jobs]
     
     def get_active_job_for_user(self, user_id: str) -> Optional[AnalysisJob]:
@@ -229,42 +338,60 @@ class ProgressManager:
         jobs = self.get_user_jobs(user_id)
         active = [j for j in jobs if j.status == "processing"]
         if active:
-            return max(active, key=lambda j: j.created_at)
+            return max(active, key=lambda j: j._created_at_mono)
         return None
     
+    def _mark_finished(self, job: AnalysisJob):
+        """Queue a job for cleanup once it reaches a terminal status"""
+        self._finished.append((time.monotonic(), job.analysis_id))
+    
+    def _pop_job(self, analysis_id: str) -> Optional[AnalysisJob]:
+        """Forget a job and its user index entry"""
+        job = self._jobs.pop(analysis_id, None)
+        if job:
+            user_job_ids = self._user_jobs.get(job.user_id)
+            if user_job_ids is not None:
+                user_job_ids.discard(analysis_id)
+                if not user_job_ids:
+                    del self._user_jobs[job.user_id]
+        return job
+    
     def cleanup_old_jobs(self, max_age_minutes: int = 30):
-        """Remove completed/failed jobs older than max_age"""
-        cutoff = datetime.utcnow() - timedelta(minutes=max_age_minutes)
-        to_remove = []
+        """Remove completed/failed jobs that finished more than max_age ago"""
+        cutoff = time.monotonic() - max_age_minutes * 60
+        removed = 0
         
-        for job_id, job in self._jobs.items():
-            if job.status in ("completed", "failed") and job.created_at < cutoff:
-                to_remove.append(job_id)
+        # Finished jobs are queued in completion order, so stop at the first fresh one
+        while self._finished and self._finished[0][0] < cutoff:
+            _, job_id = self._finished.popleft()
+            if self._pop_job(job_id):
+                removed += 1
         
-        for job_id in to_remove:
-            job = self._jobs.pop(job_id, None)
-            if job and job.user_id in self._user_jobs:
-                self._user_jobs[job.user_id] = [
-                    jid for jid in self._user_jobs[job.user_id] if jid != job_id
-                ]
-        
-        if to_remove:
-            logger.info(f"Cleaned up {len(to_remove)} old analysis jobs")
+        if removed:
+            logger.info("Cleaned up %d old analysis jobs", removed)
     
     async def start_cleanup_loop(self):
         """Start background cleanup loop"""
         while True:
+            try:
+                self.cleanup_old_jobs()
+            except Exception:
+                # Keep the loop alive, otherwise finished jobs pile up forever
+                logger.exception("Analysis job cleanup failed")
             await asyncio.sleep(300)  # Every 5 minutes
-            self.cleanup_old_jobs()
 
 
 # Singleton instance
 _progress_manager: Optional[ProgressManager] = None
+_progress_manager_lock = threading.Lock()
 
 
 def get_progress_manager() -> ProgressManager:
     """Get or create progress manager singleton"""
     global _progress_manager
     if _progress_manager is None:
-        _progress_manager = ProgressManager()
+        # Also reached from worker threads, so guard with a thread lock
+        with _progress_manager_lock:
+            if _progress_manager is None:
+                _progress_manager = ProgressManager()
     return _progress_manager
@@ -8,40 +8,215 @@ import asyncio
 import json
 import logging
 import uuid
+import orjson
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Query, status, BackgroundTasks
 from fastapi.responses import StreamingResponse
-from typing import Optional
+from typing import AsyncIterator, Optional
 
 from src.analysis.service import get_analysis_service, AnalysisService
 from src.analysis.schemas import (
     AnalysisRequest, AnalysisResponse, AnalysisStatus
 )
-from src.analysis.progress import get_progress_manager, AnalysisStep
+from src.analysis.progress import (
+    get_progress_manager, AnalysisStep, ProgressUpdate, STEP_LABELS, TERMINAL_STEPS
+)
 from src.analysis.background_service import get_background_analysis_service
+from src.analysis.storage import (
+    store_comments, with_stored_comments, delete_stored_comments, delete_documents
+)
+from src.analysis.watch import watch_document
 from src.middleware.auth import get_current_user, get_current_user_with_plan
 from src.middleware.schemas import UserResponse
+from src.youtube.service import extract_video_id
 from src.youtube.exceptions import (
     VideoNotFoundError, CommentsDisabledError, 
     QuotaExceededError, InvalidVideoIdError
 )
 from src.gemini.exceptions import RateLimitError, GeminiError
-from src.firebase_init import get_firestore
-from src.billing.service import BillingService
-from src.billing.schemas import UsageType
+from src.firebase_init import get_firestore, get_async_firestore
+from src.cache.local import LocalTTLCache
+from src.config import get_settings
+from src.billing.service import BillingService, get_billing_service
+from src.billing.schemas import UsageType, QuotaCheckResult
+from src.pubsub.publisher import get_job_publisher
+from src.pubsub.schemas import AnalysisJobStatus
+from google.api_core import exceptions as google_exceptions
 from google.cloud.firestore import SERVER_TIMESTAMP
 
 router = APIRouter(prefix="/api/analysis", tags=["Analysis"])
 logger = logging.getLogger(__name__)
 
+SSE_KEEPALIVE = b": keepalive\n\n"
+SSE_KEEPALIVE_INTERVAL = 30.0
+
+# Close progress streams that see no change for this many keepalives (~10 min)
+SSE_MAX_IDLE_KEEPALIVES = 20
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+    # Compressing proxies would buffer the stream
+    "Content-Encoding": "identity"
+}
+
+# Pub/Sub worker step descriptions -> progress stream steps
+_WORKER_STEPS = {
+    "Starting analysis": AnalysisStep.CONNECTING,
+    "Fetching comments from YouTube": AnalysisStep.FETCHING_COMMENTS,
+    "Analyzing sentiment": AnalysisStep.ANALYZING_SENTIMENT,
+    "Classifying comments": AnalysisStep.CLASSIFYING,
+    "Extracting insights": AnalysisStep.EXTRACTING_INSIGHTS,
+    "Generating summary": AnalysisStep.GENERATING_SUMMARY,
+}
+
+# Background analyses running at once in this process; the rest wait as queued
+_analysis_slots = asyncio.Semaphore(get_settings().max_concurrent_analyses)
+
+# Stored analyses polled by the dashboard, kept briefly so repeat reads skip
+# Firestore. Only parent documents are cached (stored comments are attached
+# per read), and expired entries linger until evicted, so keep it small.
+ANALYSIS_DOC_CACHE_TTL = 5
+_analysis_docs = LocalTTLCache(maxsize=32, ttl=ANALYSIS_DOC_CACHE_TTL)
+
+# Summary fields the history list renders (matches the frontend's AnalysisHistoryItem)
+HISTORY_FIELDS = [
+    "analysis_id", "video_id", "video_title", "video_thumbnail", "channel_title",
+    "status", "created_at", "completed_at", "comments_analyzed",
+    "sentiment_summary", "classification_summary",
+]
+
+# Largest page the history endpoint will return in one response
+HISTORY_MAX_LIMIT = 100
+
+# Google API errors that have a client-facing HTTP equivalent
+GOOGLE_ERROR_STATUS = {
+    google_exceptions.NotFound: status.HTTP_404_NOT_FOUND,
+    google_exceptions.PermissionDenied: status.HTTP_403_FORBIDDEN,
+    google_exceptions.DeadlineExceeded: status.HTTP_504_GATEWAY_TIMEOUT,
+    google_exceptions.ResourceExhausted: status.HTTP_429_TOO_MANY_REQUESTS,
+}
+_MAPPED_GOOGLE_ERRORS = tuple(GOOGLE_ERROR_STATUS)
+
+# Running background analyses, referenced here so they aren't garbage collected
+_analysis_tasks: set[asyncio.Task] = set()
+
+# (user_id, video_id) -> analysis_id of the background analysis running for it,
+# so a double-click or client retry joins the existing run
+_inflight_analyses: dict[tuple[str, str], str] = {}
+
+# Placeholder held in _inflight_analyses while a request is still taking the
+# credit and creating the job, before its analysis_id is known
+_STARTING = ""
+
+
+def _sse_frame(update) -> bytes:
+    """Encode a progress update as an SSE data frame, once per snapshot"""
+    if update._frame is None:
+        update._frame = b"data: " + orjson.dumps(update.model_dump(), option=orjson.OPT_UTC_Z) + b"\n\n"
+    return update._frame
+
+
+async def _sse_events(updates: AsyncIterator[Optional[ProgressUpdate]]) -> AsyncIterator[bytes]:
+    """Frame progress updates as SSE until the job finishes or the stream goes idle"""
+    idle_keepalives = 0
+    try:
+        # (None = nothing changed within the keepalive window)
+        async for update in updates:
+            if update is None:
+                idle_keepalives += 1
+                if idle_keepalives > SSE_MAX_IDLE_KEEPALIVES:
+                    break
+                yield SSE_KEEPALIVE
+                continue
+            
+            idle_keepalives = 0
+            yield _sse_frame(update)
+            
+            # End stream when complete or failed
+            if update.step in TERMINAL_STEPS:
+                break
+                
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await updates.aclose()
+
+
+def _job_status_update(job_id: str, data: dict) -> ProgressUpdate:
+    """Map a Pub/Sub job status document onto the progress stream's shape"""
+    job_status = data.get("status")
+    if job_status == AnalysisJobStatus.COMPLETED.value:
+        step = AnalysisStep.COMPLETED
+    elif job_status in (AnalysisJobStatus.FAILED.value, AnalysisJobStatus.CANCELLED.value) or not data:
+        step = AnalysisStep.FAILED
+    elif job_status == AnalysisJobStatus.PROCESSING.value:
+        step = _WORKER_STEPS.get(data.get("current_step"), AnalysisStep.CONNECTING)
+    else:
+        step = AnalysisStep.QUEUED
+    
+    return ProgressUpdate(
+        analysis_id=data.get("analysis_id") or job_id,
+        status=job_status or "failed",
+        step=step.value,
+        step_label=data.get("current_step") or STEP_LABELS[step],
+        progress=round((data.get("progress") or 0) * 100),
+        video_id=data.get("video_id"),
+        error=data.get("error_message") or (None if data else "Analysis job not found"),
+    )
+
+
+async def _job_status_updates(job_id: str) -> AsyncIterator[Optional[ProgressUpdate]]:
+    """Follow a Pub/Sub job's status document, which any replica's worker may update"""
+    doc_ref = get_firestore().collection("analysis_jobs").document(job_id)
+    async for data in watch_document(doc_ref, keepalive=SSE_KEEPALIVE_INTERVAL):
+        yield None if data is None else _job_status_update(job_id, data)
 
-async def _increment_video_usage(user_id: str, comments_analyzed: int = 0):
-    """Increment video analysis count using billing service"""
+
+async def cancel_running_analyses():
+    """Cancel in-flight background analyses (called on shutdown)"""
+    if _analysis_tasks:
+        logger.info(f"Cancelling {len(_analysis_tasks)} running analyses...")
+        for task in _analysis_tasks:
+            task.cancel()
+        await asyncio.gather(*_analysis_tasks, return_exceptions=True)
+
+
+def _google_api_error(error: Exception, action: str) -> HTTPException:
+    """Map a Google API error to its HTTP status without formatting the error"""
+    code = next(
+        code for error_type, code in GOOGLE_ERROR_STATUS.items()
+        if isinstance(error, error_type)
+    )
+    return HTTPException(status_code=code, detail=f"Failed to {action}")
+
+
+def _video_quota_error(quota_check: QuotaCheckResult) -> HTTPException:
+    """Error for a refused video credit: out of quota, or quota couldn't be checked"""
+    if not quota_check.upgrade_required:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=quota_check.message
+        )
+    return HTTPException(
+        status_code=status.HTTP_402_PAYMENT_REQUIRED,
+        detail={
+            "error": "quota_exceeded",
+            "message": f"You've used all {quota_check.limit} video analyses this month",
+            "current": quota_check.current,
+            "limit": quota_check.limit,
+            "action": "upgrade"
+        }
+    )
+
+
+async def _increment_comment_usage(user_id: str, comments_analyzed: int = 0):
+    """Count analyzed comments (the video credit was taken at request time)"""
     try:
-        billing = BillingService()
-        await billing.increment_usage(user_id, UsageType.VIDEOS, 1)
-        if comments_analyzed > 0:
-            await billing.increment_usage(user_id, UsageType.COMMENTS, comments_analyzed)
+        await get_billing_service().increment_usage_bulk(user_id, {
+            UsageType.COMMENTS: comments_analyzed,
+        })
     except Exception as e:
         logger.warning(f"Failed to increment usage: {e}")
 
@@ -49,7 +224,8 @@ async def _increment_video_usage(user_id: str, comments_analyzed: int = 0):
 @router.post("/start")
 async def start_analysis(
     request: AnalysisRequest,
-    user_data: dict = Depends(get_current_user_with_plan)
+    user_data: dict = Depends(get_current_user_with_plan),
+    billing: BillingService = Depends(get_billing_service)
 ):
     """
     Start a background analysis and return analysis_id for progress tracking.
@@ -58,64 +234,97 @@ async def start_analysis(
     Then use GET /progress/{analysis_id} to stream progress updates via SSE.
     
     Returns immediately with an analysis_id that can be used to track progress.
+    If the same video is already being analyzed for this user, returns that analysis_id.
     """
     user_id = user_data["uid"]
     
-    # Get plan from billing service (single source of truth)
-    billing = BillingService()
-    subscription = await billing.get_user_subscription(user_id)
-    user_plan = subscription.plan_id.value  # Use billing subscription, not user doc
-    
-    # Check video quota using billing service
-    quota_check = await billing.check_quota(user_id, UsageType.VIDEOS, 1)
+    try:
+        video_key = (user_id, extract_video_id(request.video_url_or_id))
+    except InvalidVideoIdError:
+        video_key = (user_id, request.video_url_or_id.strip())
     
-    if not quota_check.allowed:
+    running_id = _inflight_analyses.get(video_key)
+    if running_id == _STARTING:
         raise HTTPException(
-            status_code=status.HTTP_402_PAYMENT_REQUIRED,
-            detail={
-                "error": "quota_exceeded",
-                "message": f"You've used all {quota_check.limit} video analyses this month",
-                "current": quota_check.current,
-                "limit": quota_check.limit,
-                "action": "upgrade"
-            }
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This video's analysis is already starting. Try again in a moment."
         )
+    running_job = get_progress_manager().get_job(running_id) if running_id else None
+    if running_job and not running_job.is_cancelled():
+        return {
+            "analysis_id": running_id,
+            "status": "already_started",
+            "message": "This video is already being analyzed. Use GET /progress/{analysis_id} to track progress."
+        }
     
-    # Enforce plan limit on max_comments
-    plan = billing.get_plan(user_plan)
-    plan_comment_limit = plan.comments_per_video
+    # Reserve the video before any await, so a concurrent request for it
+    # can't also pass the check above and take a credit
+    _inflight_analyses[video_key] = _STARTING
+    try:
+        # Get plan and take one video credit atomically (refunded if the analysis fails)
+        subscription = await billing.get_user_subscription(user_id)
+        quota_check = await billing.try_consume_quota(user_id, UsageType.VIDEOS, 1)
+        user_plan = subscription.plan_id.value  # Use billing subscription, not user doc
     
-    # Use the minimum of requested comments and plan limit
-    effective_max_comments = min(request.max_comments, plan_comment_limit)
+        if not quota_check.allowed:
+            raise _video_quota_error(quota_check)
     
-    logger.info(f"User {user_id} on {user_plan} plan - requested {request.max_comments} comments, enforcing {effective_max_comments} (plan limit: {plan_comment_limit})")
+        # Enforce plan limit on max_comments
+        plan = billing.get_plan(user_plan)
+        plan_comment_limit = plan.comments_per_video
     
-    # Create a new analysis job
-    analysis_id = str(uuid.uuid4())
+        # Use the minimum of requested comments and plan limit
+        effective_max_comments = min(request.max_comments, plan_comment_limit)
     
-    progress_manager = get_progress_manager()
-    job = progress_manager.create_job(analysis_id, user_id, request.video_url_or_id)
+        logger.info(f"User {user_id} on {user_plan} plan - requested {request.max_comments} comments, enforcing {effective_max_comments} (plan limit: {plan_comment_limit})")
     
-    # Start background analysis task
-    async def run_analysis():
-        try:
-            service = get_background_analysis_service()
-            await service.run_analysis(
-                job=job,
-                video_url=request.video_url_or_id,
-                max_comments=effective_max_comments,
-                user_plan=user_plan,
-                include_sentiment=request.include_sentiment,
-                include_classification=request.include_classification,
-                include_insights=request.include_insights,
-                include_summary=request.include_summary
-            )
-        except Exception as e:
-            logger.error(f"Background analysis failed: {e}")
-            job.update_step(AnalysisStep.FAILED, error=str(e))
+        # Create a new analysis job
+        analysis_id = str(uuid.uuid4())
     
-    # Schedule the background task
-    asyncio.create_task(run_analysis())
+        progress_manager = get_progress_manager()
+        job = progress_manager.create_job(analysis_id, user_id, request.video_url_or_id)
+    
+        # Start background analysis task
+        async def run_analysis():
+            async with _analysis_slots:
+                # Cancelled while waiting for a slot
+                if job.is_cancelled():
+                    await billing.refund_usage(user_id, UsageType.VIDEOS, 1)
+                    return
+                try:
+                    service = get_background_analysis_service()
+                    await service.run_analysis(
+                        job=job,
+                        video_url=request.video_url_or_id,
+                        max_comments=effective_max_comments,
+                        user_plan=user_plan,
+                        include_sentiment=request.include_sentiment,
+                        include_classification=request.include_classification,
+                        include_insights=request.include_insights,
+                        include_summary=request.include_summary
+                    )
+                except Exception as e:
+                    logger.error(f"Background analysis failed: {e}")
+                    job.update_step(AnalysisStep.FAILED, error=str(e))
+            
+                if job.step == AnalysisStep.FAILED:
+                    await billing.refund_usage(user_id, UsageType.VIDEOS, 1)
+    
+        # Schedule the background task
+        task = asyncio.create_task(run_analysis(), name=f"analysis:{analysis_id}")
+        _analysis_tasks.add(task)
+    except BaseException:
+        if _inflight_analyses.get(video_key) == _STARTING:
+            del _inflight_analyses[video_key]
+        raise
+    _inflight_analyses[video_key] = analysis_id
+    
+    def on_done(task: asyncio.Task):
+        _analysis_tasks.discard(task)
+        if _inflight_analyses.get(video_key) == analysis_id:
+            del _inflight_analyses[video_key]
+    
+    task.add_done_callback(on_done)
     
     return {
         "analysis_id": analysis_id,
@@ -135,6 +344,8 @@ async def stream_progress(
     
     Connect to this endpoint to receive real-time progress updates.
     Each event contains step, progress percentage, and any metadata.
+    Analyses running in this process stream from memory; Pub/Sub jobs are
+    followed through their Firestore status document from any replica.
     
     Events are sent as JSON with format:
     {
@@ -146,13 +357,31 @@ async def stream_progress(
     }
     """
     user_id = user_data["uid"]
-    progress_manager = get_progress_manager()
     
-    job = progress_manager.get_job(analysis_id)
+    job = get_progress_manager().get_job(analysis_id)
     if not job:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Analysis job not found"
+        # Not running in this process: follow a Pub/Sub job through Firestore
+        try:
+            job_status = await get_job_publisher().get_job_status(analysis_id)
+        except Exception as e:
+            logger.warning(f"Failed to check Pub/Sub job status: {e}")
+            job_status = None
+        
+        if not job_status:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Analysis job not found"
+            )
+        if job_status.get("user_id") != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied"
+            )
+        
+        return StreamingResponse(
+            _sse_events(_job_status_updates(analysis_id)),
+            media_type="text/event-stream",
+            headers=SSE_HEADERS
         )
     
     # Verify ownership
@@ -162,96 +391,93 @@ async def stream_progress(
             detail="Access denied"
         )
     
-    async def event_generator():
-        queue = job.subscribe()
-        
-        try:
-            # Send current state immediately
-            current_update = job.get_current_update()
-            if current_update:
-                yield f"data: {current_update.model_dump_json()}\n\n"
-            
-            # Stream updates
-            while True:
-                try:
-                    # Wait for updates with timeout
-                    update = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"data: {update.model_dump_json()}\n\n"
-                    
-                    # End stream when complete or failed
-                    if update.step in [AnalysisStep.COMPLETED.value, AnalysisStep.FAILED.value]:
-                        break
-                        
-                except asyncio.TimeoutError:
-                    # Send keepalive
-                    yield f": keepalive\n\n"
-                    
-        except asyncio.CancelledError:
-            pass
-        finally:
-            job.unsubscribe(queue)
-    
+    # Current state first, then each change
     return StreamingResponse(
-        event_generator(),
+        _sse_events(job.updates(keepalive=SSE_KEEPALIVE_INTERVAL)),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no"
-        }
+        headers=SSE_HEADERS
     )
 
 
-@router.get("/job/{analysis_id}")
+@router.get("/job/{job_id}")
 async def get_job_status(
-    analysis_id: str,
+    job_id: str,
     user_data: dict = Depends(get_current_user_with_plan)
 ):
     """
     Get current status of an analysis job without streaming.
     
+    Works for in-memory analyses (POST /start) and Pub/Sub jobs (POST /async).
     Useful for checking status after page refresh or reconnect.
+    
+    Returns:
+        - Live progress for analyses running in this instance
+        - The Pub/Sub job record (status, progress, analysis_id, error_message)
+        - A completed summary for analyses already stored in Firestore
     """
+    
     user_id = user_data["uid"]
-    progress_manager = get_progress_manager()
     
-    job = progress_manager.get_job(analysis_id)
-    if not job:
-        # Job might be complete, check Firestore
+    # Running in this instance: answer from memory
+    job = get_progress_manager().get_job(job_id)
+    if job:
+        if job.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied"
+            )
+        return job.get_current_update().model_dump()
+    
+    async def get_queued_job() -> Optional[dict]:
         try:
-            db = get_firestore()
-            doc = db.collection("analyses").document(analysis_id).get()
-            if doc.exists:
-                data = doc.to_dict()
-                if data.get("user_id") == user_id:
-                    return {
-                        "analysis_id": analysis_id,
-                        "step": "completed",
-                        "progress": 100,
-                        "status": data.get("status", "completed"),
-                        "video_id": data.get("video", {}).get("video_id"),
-                        "video_title": data.get("video", {}).get("title")
-                    }
+            return await get_job_publisher().get_job_status(job_id)
+        except Exception as e:
+            logger.warning(f"Failed to check Pub/Sub job status: {e}")
+            return None
+    
+    async def get_stored_analysis() -> Optional[dict]:
+        cached = _analysis_docs.get(job_id)
+        if cached is not None:
+            return cached
+        try:
+            db = get_async_firestore()
+            # Only the status fields, not the full analysis payload
+            doc = await db.collection("analyses").document(job_id).get(
+                field_paths=["user_id", "status", "video.video_id", "video.title"]
+            )
+            return doc.to_dict() if doc.exists else None
         except Exception as e:
             logger.warning(f"Failed to check Firestore for job: {e}")
-        
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Analysis job not found"
-        )
+            return None
     
-    if job.user_id != user_id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Access denied"
-        )
+    # Not in memory: the Pub/Sub job record answers while it exists
+    job_status = await get_queued_job()
     
-    current = job.get_current_update()
-    return current.model_dump() if current else {
-        "analysis_id": analysis_id,
-        "step": "queued",
-        "progress": 0
-    }
+    if job_status:
+        # Verify ownership
+        if job_status.get('user_id') != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Access denied"
+            )
+        return job_status
+    
+    # No job record: fall back to an analysis already stored in Firestore
+    analysis = await get_stored_analysis()
+    if analysis and analysis.get("user_id") == user_id:
+        return {
+            "analysis_id": job_id,
+            "step": "completed",
+            "progress": 100,
+            "status": analysis.get("status", "completed"),
+            "video_id": analysis.get("video", {}).get("video_id"),
+            "video_title": analysis.get("video", {}).get("title")
+        }
+    
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Analysis job not found"
+    )
 
 
 @router.post("/", response_model=AnalysisResponse)
@@ -259,7 +485,8 @@ async def analyze_video(
     request: AnalysisRequest,
     background_tasks: BackgroundTasks,
     user_data: dict = Depends(get_current_user_with_plan),
-    analysis_service: AnalysisService = Depends(get_analysis_service)
+    analysis_service: AnalysisService = Depends(get_analysis_service),
+    billing: BillingService = Depends(get_billing_service)
 ):
     """
     Analyze a YouTube video's comments
@@ -278,25 +505,13 @@ async def analyze_video(
     """
     user_id = user_data["uid"]
     
-    # Get plan from billing service (single source of truth)
-    billing = BillingService()
+    # Get plan and take one video credit atomically (refunded if the analysis fails)
     subscription = await billing.get_user_subscription(user_id)
+    quota_check = await billing.try_consume_quota(user_id, UsageType.VIDEOS, 1)
     user_plan = subscription.plan_id.value
     
-    # Check video quota using billing service
-    quota_check = await billing.check_quota(user_id, UsageType.VIDEOS, 1)
-    
     if not quota_check.allowed:
-        raise HTTPException(
-            status_code=status.HTTP_402_PAYMENT_REQUIRED,
-            detail={
-                "error": "quota_exceeded",
-                "message": f"You've used all {quota_check.limit} video analyses this month",
-                "current": quota_check.current,
-                "limit": quota_check.limit,
-                "action": "upgrade"
-            }
-        )
+        raise _video_quota_error(quota_check)
     
     # Enforce plan limit on max_comments
     plan = billing.get_plan(user_plan)
@@ -309,23 +524,18 @@ async def analyze_video(
     logger.info(f"User {user_id} on {user_plan} plan - enforcing {effective_max_comments} comments (plan limit: {plan_comment_limit})")
     
     try:
-        result = await analysis_service.analyze(
-            request=request,
-            user_id=user_id,
-            user_plan=user_plan
-        )
+        try:
+            result = await analysis_service.analyze(
+                request=request,
+                user_id=user_id,
+                user_plan=user_plan
+            )
+        except Exception:
+            await billing.refund_usage(user_id, UsageType.VIDEOS, 1)
+            raise
         
-        # Increment usage in background
-        if result.status == AnalysisStatus.COMPLETED:
-            comments_count = len(result.comments) if result.comments else 0
-            background_tasks.add_task(_increment_video_usage, user_id, comments_count)
-        
-        # Store analysis in Firestore for history
-        background_tasks.add_task(
-            _store_analysis,
-            user_id=user_id,
-            analysis=result
-        )
+        # Store analysis for history and increment usage in one background task
+        background_tasks.add_task(_record_analysis, user_id=user_id, analysis=result)
         
         return result
         
@@ -364,20 +574,28 @@ async def analyze_video(
 async def _store_analysis(user_id: str, analysis: AnalysisResponse):
     """Store analysis result in Firestore"""
     try:
-        db = get_firestore()
+        db = get_async_firestore()
         
-        # Convert to dict for storage
-        analysis_dict = analysis.model_dump(mode="json")
+        # Convert to dict. Null fields are dropped to keep the document
+        # small; readers already treat missing fields as defaults.
+        analysis_dict = analysis.model_dump(mode="json", exclude_none=True)
         analysis_dict["user_id"] = user_id
         analysis_dict["stored_at"] = SERVER_TIMESTAMP
         
+        # Comments live in a subcollection, written before the parent doc
+        stored_comments = analysis_dict.pop("stored_comments", None) or []
+        await store_comments(db, analysis.analysis_id, stored_comments)
+        
+        # Analysis and history entry are written atomically in one round trip
+        batch = db.batch()
+        
         # Store in analyses collection
-        db.collection("analyses").document(analysis.analysis_id).set(analysis_dict)
+        batch.set(db.collection("analyses").document(analysis.analysis_id), analysis_dict)
         
         # Also add to user's analysis history
-        db.collection("users").document(user_id).collection("analyses").document(
+        batch.set(db.collection("users").document(user_id).collection("analyses").document(
             analysis.analysis_id
-        ).set({
+        ), {
             "analysis_id": analysis.analysis_id,
             "video_id": analysis.video.video_id,
             "video_title": analysis.video.title,
@@ -386,48 +604,69 @@ async def _store_analysis(user_id: str, analysis: AnalysisResponse):
             "comments_analyzed": analysis.comments_analyzed
         })
         
+        await batch.commit()
+        _analysis_docs.pop(analysis.analysis_id)
+        
     except Exception as e:
         import logging
         logging.error(f"Failed to store analysis: {e}")
 
 
+async def _record_analysis(user_id: str, analysis: AnalysisResponse):
+    """Store the analysis and settle its usage - concurrently"""
+    tasks = [_store_analysis(user_id, analysis)]
+    if analysis.status == AnalysisStatus.COMPLETED:
+        tasks.append(_increment_comment_usage(user_id, analysis.comments_analyzed))
+    else:
+        tasks.append(get_billing_service().refund_usage(user_id, UsageType.VIDEOS, 1))
+    
+    await asyncio.gather(*tasks)
+
+
 @router.get("/history")
 async def get_analysis_history(
-    limit: int = 10,
+    limit: int = Query(10, ge=1, le=HISTORY_MAX_LIMIT),
+    after: Optional[str] = None,
     user_data: dict = Depends(get_current_user_with_plan)
 ):
     """
     Get user's analysis history including in-progress analyses
     
     Returns a list of previous analyses with basic info, plus any currently processing videos.
+    Pass the `created_at` of the last entry as `after` to get the next page.
     """
     user_id = user_data["uid"]
     
     try:
-        db = get_firestore()
+        db = get_async_firestore()
         analyses_ref = (
             db.collection("users")
             .document(user_id)
             .collection("analyses")
+            .select(HISTORY_FIELDS)
             .order_by("created_at", direction="DESCENDING")
-            .limit(limit)
         )
+        if after:
+            analyses_ref = analyses_ref.start_after({"created_at": after})
+        analyses_ref = analyses_ref.limit(limit)
         
-        analyses = []
-        for doc in analyses_ref.stream():
-            analyses.append(doc.to_dict())
-        
-        # Add currently processing videos from progress manager
+        # Currently processing videos from progress manager, newest first
+        # (first page only)
         progress_mgr = get_progress_manager()
-        active_jobs = progress_mgr.get_user_jobs(user_id)
+        active_jobs = [] if after else sorted(
+            progress_mgr.get_user_jobs(user_id),
+            key=lambda job: job.created_at,
+            reverse=True
+        )
         
+        processing = []
         for job in active_jobs:
             # Only include if not yet completed or failed
-            if job.step not in [AnalysisStep.COMPLETED.value, AnalysisStep.FAILED.value]:
+            if job.step not in TERMINAL_STEPS:
                 current_update = job.get_current_update()
                 if current_update:
                     # Create a processing entry
-                    processing_entry = {
+                    processing.append({
                         "analysis_id": job.analysis_id,
                         "video_id": current_update.video_id or "",
                         "video_title": current_update.video_title or "Processing...",
@@ -436,24 +675,30 @@ async def get_analysis_history(
                         "progress": current_update.progress,
                         "step": current_update.step,
                         "step_label": current_update.step_label,
-                        "created_at": datetime.utcnow().isoformat(),
+                        "created_at": job.created_at.isoformat(),
                         "comments_analyzed": current_update.comments_fetched or 0,
-                    }
-                    analyses.insert(0, processing_entry)  # Add at the top
+                    })
+        
+        # Processing entries go on top of the stored history
+        analyses = processing + [doc.to_dict() async for doc in analyses_ref.stream()]
         
         return {"analyses": analyses, "count": len(analyses)}
         
-    except Exception as e:
+    except _MAPPED_GOOGLE_ERRORS as e:
+        raise _google_api_error(e, "fetch history")
+    except Exception:
+        logger.exception("Failed to fetch history")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch history: {str(e)}"
+            detail="Failed to fetch history"
         )
 
 
 @router.post("/async", status_code=status.HTTP_202_ACCEPTED)
 async def submit_async_analysis(
     request: AnalysisRequest,
-    user_data: dict = Depends(get_current_user_with_plan)
+    user_data: dict = Depends(get_current_user_with_plan),
+    billing: BillingService = Depends(get_billing_service)
 ):
     """
     Submit an analysis job for asynchronous processing via Pub/Sub.
@@ -469,29 +714,16 @@ async def submit_async_analysis(
         - status: Job status (queued)
         - message: Instructions for tracking progress
     """
-    from src.pubsub.publisher import JobPublisher
     
     user_id = user_data["uid"]
     
-    # Get plan from billing service (single source of truth)
-    billing = BillingService()
+    # Get plan and take one video credit atomically (refunded if the analysis fails)
     subscription = await billing.get_user_subscription(user_id)
+    quota_check = await billing.try_consume_quota(user_id, UsageType.VIDEOS, 1)
     user_plan = subscription.plan_id.value
     
-    # Check video quota using billing service
-    quota_check = await billing.check_quota(user_id, UsageType.VIDEOS, 1)
-    
     if not quota_check.allowed:
-        raise HTTPException(
-            status_code=status.HTTP_402_PAYMENT_REQUIRED,
-            detail={
-                "error": "quota_exceeded",
-                "message": f"You've used all {quota_check.limit} video analyses this month",
-                "current": quota_check.current,
-                "limit": quota_check.limit,
-                "action": "upgrade"
-            }
-        )
+        raise _video_quota_error(quota_check)
     
     # Enforce plan limit on max_comments
     plan = billing.get_plan(user_plan)
@@ -504,7 +736,7 @@ async def submit_async_analysis(
     
     # Publish job to Pub/Sub
     try:
-        publisher = JobPublisher()
+        publisher = get_job_publisher()
         job_id = await publisher.publish_analysis_job(
             user_id=user_id,
             video_id=request.video_url_or_id,
@@ -521,59 +753,15 @@ async def submit_async_analysis(
             "status": "queued",
             "message": "Analysis job queued. Use GET /job/{job_id} to check status."
         }
-    except Exception as e:
-        logger.error(f"Failed to submit async analysis: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to queue analysis job: {str(e)}"
-        )
-
-
-@router.get("/job/{job_id}")
-async def get_job_status(
-    job_id: str,
-    user_data: dict = Depends(get_current_user_with_plan)
-):
-    """
-    Get the status of an async analysis job.
-    
-    Returns:
-        - job_id: Job identifier
-        - status: pending/queued/processing/completed/failed
-        - progress: Current progress (0.0-1.0)
-        - current_step: Current processing step
-        - analysis_id: Analysis document ID (when completed)
-        - error_message: Error details (if failed)
-    """
-    from src.pubsub.publisher import JobPublisher
-    
-    user_id = user_data["uid"]
-    
-    try:
-        publisher = JobPublisher()
-        job_status = await publisher.get_job_status(job_id)
-        
-        if not job_status:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Job not found"
-            )
-        
-        # Verify ownership
-        if job_status.get('user_id') != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Access denied"
-            )
-        
-        return job_status
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Failed to get job status: {e}")
+    except _MAPPED_GOOGLE_ERRORS as e:
+        await billing.refund_usage(user_id, UsageType.VIDEOS, 1)
+        raise _google_api_error(e, "queue analysis job")
+    except Exception:
+        logger.exception("Failed to submit async analysis")
+        await billing.refund_usage(user_id, UsageType.VIDEOS, 1)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to get job status: {str(e)}"
+            detail="Failed to queue analysis job"
         )
 
 
@@ -587,12 +775,11 @@ async def cancel_job(
     
     Can only cancel jobs that haven't started processing yet.
     """
-    from src.pubsub.publisher import JobPublisher
     
     user_id = user_data["uid"]
     
     try:
-        publisher = JobPublisher()
+        publisher = get_job_publisher()
         cancelled = await publisher.cancel_job(job_id, user_id)
         
         if not cancelled:
@@ -608,11 +795,13 @@ async def cancel_job(
         }
     except HTTPException:
         raise
-    except Exception as e:
-        logger.error(f"Failed to cancel job: {e}")
+    except _MAPPED_GOOGLE_ERRORS as e:
+        raise _google_api_error(e, "cancel job")
+    except Exception:
+        logger.exception("Failed to cancel job")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to cancel job: {str(e)}"
+            detail="Failed to cancel job"
         )
 
 
@@ -636,8 +825,7 @@ async def cancel_active_analysis(
         
         if not job:
             # Try to cancel via pub/sub (if it's queued)
-            from src.pubsub.publisher import JobPublisher
-            publisher = JobPublisher()
+            publisher = get_job_publisher()
             cancelled = await publisher.cancel_job(analysis_id, user_id)
             
             if cancelled:
@@ -662,24 +850,19 @@ async def cancel_active_analysis(
         # Mark as failed/cancelled in progress manager
         job.update_step(AnalysisStep.FAILED, error="Analysis cancelled by user")
         
-        # Also delete from Firestore to clean up
+        # Also delete from Firestore to clean up (deleting a missing doc is a no-op)
         try:
-            db = get_firestore()
-            
-            # Delete from global analyses collection
-            global_doc_ref = db.collection("analyses").document(analysis_id)
-            if global_doc_ref.get().exists:
-                global_doc_ref.delete()
-            
-            # Delete from user's analyses subcollection
-            user_doc_ref = db.collection("users") \
-                .document(user_id) \
-                .collection("analyses") \
-                .document(analysis_id)
-            if user_doc_ref.get().exists:
-                user_doc_ref.delete()
+            db = get_async_firestore()
+            await delete_documents(db, [
+                db.collection("analyses").document(analysis_id),
+                db.collection("users")
+                    .document(user_id)
+                    .collection("analyses")
+                    .document(analysis_id),
+            ])
         except Exception as cleanup_error:
             logger.warning(f"Failed to clean up cancelled analysis: {cleanup_error}")
+        _analysis_docs.pop(analysis_id)
         
         return {
             "analysis_id": analysis_id,
@@ -689,11 +872,13 @@ async def cancel_active_analysis(
         
     except HTTPException:
         raise
-    except Exception as e:
-        logger.error(f"Failed to cancel analysis: {e}")
+    except _MAPPED_GOOGLE_ERRORS as e:
+        raise _google_api_error(e, "cancel analysis")
+    except Exception:
+        logger.exception("Failed to cancel analysis")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to cancel analysis: {str(e)}"
+            detail="Failed to cancel analysis"
         )
 
 
@@ -709,23 +894,35 @@ async def get_analysis(
     """
     user_id = user_data["uid"]
     
+    # Just-completed analyses are served from memory while they're being stored
+    job = get_progress_manager().get_job(analysis_id)
+    if job and job.result and job.user_id == user_id:
+        return job.result
+    
     try:
-        db = get_firestore()
+        db = get_async_firestore()
 
         # First try the full analysis document in the global 'analyses' collection
-        global_doc = db.collection("analyses").document(analysis_id).get()
-        if global_doc.exists:
-            analysis_data = global_doc.to_dict()
-            # Verify ownership
+        analysis_data = _analysis_docs.get(analysis_id)
+        if analysis_data is None:
+            global_doc = await db.collection("analyses").document(analysis_id).get()
+            if global_doc.exists:
+                analysis_data = global_doc.to_dict()
+                _analysis_docs.set(analysis_id, analysis_data)
+        
+        if analysis_data is not None:
+            # Verify ownership (also for cached documents)
             if analysis_data.get("user_id") != user_id:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Access denied"
                 )
-            return AnalysisResponse(**analysis_data)
+            # Comments are attached to a copy so the cached parent stays small.
+            # Validated once by the response model, not again here
+            return await with_stored_comments(db, analysis_id, dict(analysis_data))
 
         # Fallback to the user's summary document under users/{user_id}/analyses/{analysis_id}
-        doc = db.collection("users") \
+        doc = await db.collection("users") \
             .document(user_id) \
             .collection("analyses") \
             .document(analysis_id).get()
@@ -738,7 +935,7 @@ async def get_analysis(
 
         summary = doc.to_dict()
 
-        # Build a minimal AnalysisResponse from the summary doc so pydantic validation passes
+        # Build a minimal AnalysisResponse payload from the summary doc so validation passes
         created_at = summary.get("created_at")
         if isinstance(created_at, str):
             try:
@@ -762,14 +959,17 @@ async def get_analysis(
             "comments_analyzed": summary.get("comments_analyzed") or 0,
         }
 
-        return AnalysisResponse(**minimal)
+        return minimal
 
     except HTTPException:
         raise
-    except Exception as e:
+    except _MAPPED_GOOGLE_ERRORS as e:
+        raise _google_api_error(e, "fetch analysis")
+    except Exception:
+        logger.exception("Failed to fetch analysis")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch analysis: {str(e)}"
+            detail="Failed to fetch analysis"
         )
 
 
@@ -789,11 +989,11 @@ async def delete_analysis(
     user_id = user_data["uid"]
     
     try:
-        db = get_firestore()
+        db = get_async_firestore()
 
         # First check if the analysis exists and belongs to the user
         global_doc_ref = db.collection("analyses").document(analysis_id)
-        global_doc = global_doc_ref.get()
+        global_doc = await global_doc_ref.get()
         
         video_id = None
         if global_doc.exists:
@@ -805,54 +1005,59 @@ async def delete_analysis(
                     detail="Access denied"
                 )
             
-            video_id = analysis_data.get("video_id")
-            
-            # Delete the global analysis document
-            global_doc_ref.delete()
+            video_id = analysis_data.get("video", {}).get("video_id")
         
-        # Delete the user's summary document
+        # The user's summary document; only read it when there's no global
+        # document to prove the analysis exists (deleting a missing doc is a no-op)
         user_doc_ref = db.collection("users") \
             .document(user_id) \
             .collection("analyses") \
             .document(analysis_id)
         
-        user_doc = user_doc_ref.get()
-        if user_doc.exists:
-            user_doc_ref.delete()
+        if not global_doc.exists:
+            user_doc = await user_doc_ref.get()
+            if not user_doc.exists:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Analysis not found"
+                )
+            video_id = user_doc.to_dict().get("video_id")
         
-        # Delete all conversations associated with this video
+        # Delete both analysis documents and all conversations about this video
+        # in batched commits
+        refs = [global_doc_ref, user_doc_ref] if global_doc.exists else [user_doc_ref]
+        conversation_refs = []
         if video_id:
-            conversations_ref = db.collection("conversations")
-            query = conversations_ref.where("video_id", "==", video_id).where("user_id", "==", user_id)
-            conversations = query.get()
-            
-            deleted_count = 0
-            for conv_doc in conversations:
-                conv_doc.reference.delete()
-                deleted_count += 1
-            
-            if deleted_count > 0:
-                logger.info(f"Deleted {deleted_count} conversation(s) associated with video {video_id}")
+            conversations = db.collection("conversations") \
+                .where("video_id", "==", video_id) \
+                .where("user_id", "==", user_id) \
+                .select([]) \
+                .stream()
+            conversation_refs = [conv_doc.reference async for conv_doc in conversations]
         
-        # If neither document existed, return 404
-        if not global_doc.exists and not user_doc.exists:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Analysis not found"
-            )
+        await delete_documents(db, refs + conversation_refs)
+        _analysis_docs.pop(analysis_id)
+        if global_doc.exists:
+            await delete_stored_comments(db, analysis_id)
+        
+        deleted_count = len(conversation_refs)
+        if deleted_count > 0:
+            logger.info(f"Deleted {deleted_count} conversation(s) associated with video {video_id}")
 
         return {
             "success": True,
             "message": "Analysis deleted successfully",
-            "conversations_deleted": deleted_count if video_id else 0
+            "conversations_deleted": deleted_count
         }
 
     except HTTPException:
         raise
-    except Exception as e:
-        logger.error(f"Failed to delete analysis: {e}")
+    except _MAPPED_GOOGLE_ERRORS as e:
+        raise _google_api_error(e, "delete analysis")
+    except Exception:
+        logger.exception("Failed to delete analysis")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to delete analysis: {str(e)}"
+            detail="Failed to delete analysis"
         )
 
@@ -2,12 +2,18 @@
 Analysis Pipeline Schemas
 """
 
-from pydantic import BaseModel, Field
-from typing import Optional
+import sys
+from pydantic import AfterValidator, BaseModel, Field
+from typing import Annotated, Optional
 from datetime import datetime
 from enum import Enum
 
 
+# AI-returned labels are normalized and interned, so thousands of comments
+# share one string per label and "Positive" counts as "positive"
+Label = Annotated[str, AfterValidator(lambda value: sys.intern(value.strip().lower()))]
+
+
 class AnalysisStatus(str, Enum):
     """Analysis job status"""
     PENDING = "pending"
@@ -33,7 +39,7 @@ class AnalysisRequest(BaseModel):
 class CommentSentiment(BaseModel):
     """Sentiment for a single comment"""
     comment_id: str
-    sentiment: str  # positive, negative, neutral, mixed
+    sentiment: Label  # positive, negative, neutral, mixed
     confidence: float
     emotion: Optional[str] = None
 
@@ -58,11 +64,15 @@ class SentimentResult(BaseModel):
 class CommentClassification(BaseModel):
     """Classification for a single comment"""
     comment_id: str
-    primary_category: str
-    secondary_category: Optional[str] = None
+    primary_category: Label
+    secondary_category: Optional[Label] = None
     confidence: float
 
 
+# Categories counted in ClassificationSummary.actionable_count
+ACTIONABLE_CATEGORIES = frozenset({"question", "suggestion", "request", "feedback"})
+
+
 class ClassificationSummary(BaseModel):
     """Category distribution"""
     category_counts: dict[str, int]
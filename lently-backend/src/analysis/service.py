@@ -3,18 +3,22 @@ Analysis Pipeline Service
 Orchestrates the full comment analysis workflow
 """
 
+import asyncio
 import json
 import logging
 import uuid
+import orjson
+from collections import Counter
 from datetime import datetime
 from typing import Optional
 
 from src.youtube.service import get_youtube_service, YouTubeService
 from src.youtube.schemas import FetchCommentsRequest, Comment, VideoMetadata
-from src.gemini.client import get_gemini_client, GeminiClient
+from src.gemini.client import GeminiClient
+from src.gemini.cached_client import get_cached_gemini_client
 from src.gemini.prompts.analysis import (
-    SENTIMENT_ANALYSIS_PROMPT, CLASSIFICATION_PROMPT,
-    INSIGHTS_PROMPT, SUMMARY_PROMPT
+    SENTIMENT_BATCH_PROMPT, CLASSIFICATION_BATCH_PROMPT,
+    INSIGHTS_PROMPT, SUMMARY_PROMPT, render_comments_prompt
 )
 from src.gemini.exceptions import GeminiError
 from src.analysis.schemas import (
@@ -22,14 +26,19 @@ from src.analysis.schemas import (
     SentimentResult, SentimentSummary, CommentSentiment,
     ClassificationResult, ClassificationSummary, CommentClassification,
     InsightsResult, KeyTheme, ContentIdea, AudienceInsight,
-    ExecutiveSummary, VideoInfo, StoredComment
+    ExecutiveSummary, VideoInfo, StoredComment, ACTIONABLE_CATEGORIES
 )
+from src.analysis.dedup import fold_duplicates, fan_out
 from src.utils.text_sanitizer import sanitize_ai_text, sanitize_priority_actions
 
 logger = logging.getLogger(__name__)
 
-# Max comments to send in a single AI request
-BATCH_SIZE = 50
+# Max comments to send in a single AI request, the same size the
+# background pipeline has proven to return reliable JSON for
+BATCH_SIZE = 75
+
+# Max Gemini batch calls in flight per stage (avoids rate limits)
+MAX_CONCURRENT_BATCHES = 3
 
 
 class AnalysisService:
@@ -48,20 +57,20 @@ class AnalysisService:
         gemini: GeminiClient = None
     ):
         self.youtube = youtube or get_youtube_service()
-        self.gemini = gemini or get_gemini_client()
+        self.gemini = gemini or get_cached_gemini_client()
     
     def _prepare_comments_json(self, comments: list[Comment]) -> str:
-        """Convert comments to JSON for prompts"""
-        comment_data = []
-        for c in comments:
-            comment_data.append({
+        """Convert comments to JSON for prompts (compact, UTF-8)"""
+        return orjson.dumps([
+            {
                 "id": c.comment_id,
                 "author": c.author,
                 "text": c.text[:500],  # Truncate long comments
                 "likes": c.like_count,
                 "replies": c.reply_count
-            })
-        return json.dumps(comment_data, indent=2)
+            }
+            for c in comments
+        ]).decode()
     
     async def analyze(
         self,
@@ -112,35 +121,36 @@ class AnalysisService:
                     error="Not enough comments to analyze (minimum 5 required)"
                 )
             
-            # Initialize results
-            sentiment_result = None
-            classification_result = None
-            insights_result = None
             summary_result = None
             
-            # Step 2: Sentiment Analysis
-            if request.include_sentiment:
-                logger.info(f"[{analysis_id}] Analyzing sentiment...")
-                sentiment_result = await self._analyze_sentiment(
-                    comments=comments,
-                    video=video
-                )
+            # Steps 2-4: Sentiment, classification and insights are independent,
+            # so run them in parallel
+            logger.info(f"[{analysis_id}] Analyzing sentiment, classification and insights...")
             
-            # Step 3: Classification
-            if request.include_classification:
-                logger.info(f"[{analysis_id}] Classifying comments...")
-                classification_result = await self._classify_comments(
-                    comments=comments,
-                    video=video
-                )
+            async def run_sentiment():
+                if request.include_sentiment:
+                    return await self._analyze_sentiment(comments=comments, video=video)
+                return None
             
-            # Step 4: Extract Insights
-            if request.include_insights:
-                logger.info(f"[{analysis_id}] Extracting insights...")
-                insights_result = await self._extract_insights(
-                    comments=comments,
-                    video=video
-                )
+            async def run_classification():
+                if request.include_classification:
+                    return await self._classify_comments(comments=comments, video=video)
+                return None
+            
+            async def run_insights():
+                if request.include_insights:
+                    return await self._extract_insights(comments=comments, video=video)
+                return None
+            
+            # Let every stage finish before surfacing a failure
+            results = await asyncio.gather(
+                run_sentiment(), run_classification(), run_insights(),
+                return_exceptions=True
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            sentiment_result, classification_result, insights_result = results
             
             # Step 5: Generate Summary
             if request.include_summary and sentiment_result and classification_result:
@@ -207,20 +217,18 @@ class AnalysisService:
         classification_result: Optional[ClassificationResult]
     ) -> list[StoredComment]:
         """Build stored comments for Ask AI feature"""
-        # Create lookup maps for sentiment and classification
-        sentiment_map = {}
-        if sentiment_result:
-            for cs in sentiment_result.comments:
-                sentiment_map[cs.comment_id] = cs.sentiment
-        
-        classification_map = {}
-        if classification_result:
-            for cc in classification_result.comments:
-                classification_map[cc.comment_id] = cc.primary_category
+        # Lookup maps for sentiment and classification
+        sentiment_map = (
+            {cs.comment_id: cs.sentiment for cs in sentiment_result.comments}
+            if sentiment_result else {}
+        )
+        classification_map = (
+            {cc.comment_id: cc.primary_category for cc in classification_result.comments}
+            if classification_result else {}
+        )
         
-        stored = []
-        for comment in comments:
-            stored.append(StoredComment(
+        return [
+            StoredComment(
                 comment_id=comment.comment_id,
                 author=comment.author,
                 text=comment.text[:1000],  # Limit text length
@@ -230,59 +238,73 @@ class AnalysisService:
                 category=classification_map.get(comment.comment_id),
                 is_question=comment.is_question,
                 is_feedback=comment.is_feedback
-            ))
-        
-        return stored
+            )
+            for comment in comments
+        ]
     
     async def _analyze_sentiment(
         self,
         comments: list[Comment],
         video: VideoMetadata
     ) -> SentimentResult:
-        """Analyze sentiment of comments"""
-        # Process in batches for large comment sets
-        all_comment_sentiments = []
+        """Analyze sentiment of comments, batches run concurrently"""
+        # Identical comments are analyzed once
+        unique, duplicates = fold_duplicates(comments, lambda c: c.text[:500], lambda c: c.comment_id)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
         
-        for i in range(0, len(comments), BATCH_SIZE):
-            batch = comments[i:i + BATCH_SIZE]
-            
-            prompt = SENTIMENT_ANALYSIS_PROMPT.format(
-                video_title=video.title,
-                channel_name=video.channel_title,
-                comments_json=self._prepare_comments_json(batch)
-            )
-            
+        # Video context is fixed for the run, render it once
+        head, tail = render_comments_prompt(
+            SENTIMENT_BATCH_PROMPT,
+            video_title=video.title,
+            channel_name=video.channel_title
+        )
+        
+        async def process_batch(batch: list[Comment]) -> list[CommentSentiment]:
+            prompt = head + self._prepare_comments_json(batch) + tail
             try:
-                result = await self.gemini.generate_json(prompt)
-                
-                # Parse comment sentiments
-                for cs in result.get("comments", []):
-                    all_comment_sentiments.append(CommentSentiment(
+                async with semaphore:
+                    result = await self.gemini.generate_json(prompt)
+                return [
+                    CommentSentiment(
                         comment_id=cs["comment_id"],
                         sentiment=cs["sentiment"],
                         confidence=cs.get("confidence", 0.8),
                         emotion=cs.get("emotion")
-                    ))
-                
-                # Get summary from last batch
-                if i + BATCH_SIZE >= len(comments):
-                    summary_data = result.get("summary", {})
-                    summary = SentimentSummary(
-                        positive_percentage=summary_data.get("positive_percentage", 0),
-                        negative_percentage=summary_data.get("negative_percentage", 0),
-                        neutral_percentage=summary_data.get("neutral_percentage", 0),
-                        mixed_percentage=summary_data.get("mixed_percentage", 0),
-                        dominant_sentiment=summary_data.get("dominant_sentiment", "neutral"),
-                        top_emotions=summary_data.get("top_emotions", []),
-                        sentiment_trend=summary_data.get("sentiment_trend")
                     )
-                    
+                    for cs in result.get("comments", [])
+                ]
             except GeminiError as e:
                 logger.warning(f"Sentiment batch failed: {e}")
-                continue
+                return []
         
-        # Calculate summary if not set
-        if not all_comment_sentiments:
+        results = await asyncio.gather(*[
+            process_batch(unique[i:i + BATCH_SIZE])
+            for i in range(0, len(unique), BATCH_SIZE)
+        ])
+        all_comment_sentiments = fan_out(
+            [s for sentiments in results for s in sentiments], duplicates
+        )
+        
+        # Summary is aggregated from the per-comment labels of every batch
+        if all_comment_sentiments:
+            total = len(all_comment_sentiments)
+            counts = Counter(s.sentiment for s in all_comment_sentiments)
+            emotions = Counter(s.emotion for s in all_comment_sentiments if s.emotion)
+            
+            summary = SentimentSummary(
+                positive_percentage=round(counts["positive"] / total * 100, 1),
+                negative_percentage=round(counts["negative"] / total * 100, 1),
+                neutral_percentage=round(counts["neutral"] / total * 100, 1),
+                mixed_percentage=round(counts["mixed"] / total * 100, 1),
+                # Ties resolve in this order
+                dominant_sentiment=max(
+                    ("positive", "negative", "neutral", "mixed"),
+                    key=counts.__getitem__
+                ),
+                top_emotions=[emotion for emotion, _ in emotions.most_common(3)],
+                sentiment_trend=None
+            )
+        else:
             summary = SentimentSummary(
                 positive_percentage=0,
                 negative_percentage=0,
@@ -292,26 +314,6 @@ class AnalysisService:
                 top_emotions=[],
                 sentiment_trend=None
             )
-        elif 'summary' not in locals():
-            # Calculate from collected sentiments
-            total = len(all_comment_sentiments)
-            pos = sum(1 for s in all_comment_sentiments if s.sentiment == "positive")
-            neg = sum(1 for s in all_comment_sentiments if s.sentiment == "negative")
-            neu = sum(1 for s in all_comment_sentiments if s.sentiment == "neutral")
-            mix = sum(1 for s in all_comment_sentiments if s.sentiment == "mixed")
-            
-            summary = SentimentSummary(
-                positive_percentage=round(pos / total * 100, 1),
-                negative_percentage=round(neg / total * 100, 1),
-                neutral_percentage=round(neu / total * 100, 1),
-                mixed_percentage=round(mix / total * 100, 1),
-                dominant_sentiment=max(
-                    [("positive", pos), ("negative", neg), ("neutral", neu), ("mixed", mix)],
-                    key=lambda x: x[1]
-                )[0],
-                top_emotions=[],
-                sentiment_trend=None
-            )
         
         return SentimentResult(
             comments=all_comment_sentiments,
@@ -323,38 +325,42 @@ class AnalysisService:
         comments: list[Comment],
         video: VideoMetadata
     ) -> ClassificationResult:
-        """Classify comments into categories"""
-        all_classifications = []
-        category_counts = {}
+        """Classify comments into categories, batches run concurrently"""
+        # Identical comments are classified once
+        unique, duplicates = fold_duplicates(comments, lambda c: c.text[:500], lambda c: c.comment_id)
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_BATCHES)
         
-        for i in range(0, len(comments), BATCH_SIZE):
-            batch = comments[i:i + BATCH_SIZE]
-            
-            prompt = CLASSIFICATION_PROMPT.format(
-                video_title=video.title,
-                channel_name=video.channel_title,
-                comments_json=self._prepare_comments_json(batch)
-            )
-            
+        # Video context is fixed for the run, render it once
+        head, tail = render_comments_prompt(
+            CLASSIFICATION_BATCH_PROMPT,
+            video_title=video.title,
+            channel_name=video.channel_title
+        )
+        
+        async def process_batch(batch: list[Comment]) -> list[CommentClassification]:
+            prompt = head + self._prepare_comments_json(batch) + tail
             try:
-                result = await self.gemini.generate_json(prompt)
-                
-                for cc in result.get("comments", []):
-                    classification = CommentClassification(
+                async with semaphore:
+                    result = await self.gemini.generate_json(prompt)
+                return [
+                    CommentClassification(
                         comment_id=cc["comment_id"],
                         primary_category=cc["primary_category"],
                         secondary_category=cc.get("secondary_category"),
                         confidence=cc.get("confidence", 0.8)
                     )
-                    all_classifications.append(classification)
-                    
-                    # Count categories
-                    cat = cc["primary_category"]
-                    category_counts[cat] = category_counts.get(cat, 0) + 1
-                    
+                    for cc in result.get("comments", [])
+                ]
             except GeminiError as e:
                 logger.warning(f"Classification batch failed: {e}")
-                continue
+                return []
+        
+        results = await asyncio.gather(*[
+            process_batch(unique[i:i + BATCH_SIZE])
+            for i in range(0, len(unique), BATCH_SIZE)
+        ])
+        all_classifications = fan_out([c for batch in results for c in batch], duplicates)
+        category_counts = dict(Counter(c.primary_category for c in all_classifications))
         
         # Build summary
         total = len(all_classifications) or 1
@@ -363,10 +369,9 @@ class AnalysisService:
             for k, v in category_counts.items()
         }
         
-        actionable_categories = ["question", "suggestion", "request", "feedback"]
         actionable_count = sum(
             category_counts.get(cat, 0) 
-            for cat in actionable_categories
+            for cat in ACTIONABLE_CATEGORIES
         )
         
         top_category = max(category_counts.items(), key=lambda x: x[1])[0] if category_counts else "other"
@@ -0,0 +1,68 @@
+"""
+Analysis Storage Helpers
+Stored comments live in a subcollection (analyses/{analysis_id}/comments)
+so the parent document stays small and under Firestore's 1MB limit.
+"""
+
+import asyncio
+
+from google.cloud.firestore import AsyncClient
+
+COMMENTS_SUBCOLLECTION = "comments"
+
+# Firestore caps a single write batch at 500 operations
+WRITE_BATCH_LIMIT = 500
+
+
+def _comments_ref(db: AsyncClient, analysis_id: str):
+    return db.collection("analyses").document(analysis_id).collection(COMMENTS_SUBCOLLECTION)
+
+
+async def store_comments(db: AsyncClient, analysis_id: str, comments: list[dict]):
+    """Write stored comments in parallel batches, keeping their original order"""
+    comments_ref = _comments_ref(db, analysis_id)
+    commits = []
+
+    for start in range(0, len(comments), WRITE_BATCH_LIMIT):
+        batch = db.batch()
+        for position, comment in enumerate(comments[start:start + WRITE_BATCH_LIMIT], start):
+            batch.set(comments_ref.document(comment["comment_id"]), {**comment, "position": position})
+        commits.append(batch.commit())
+
+    await asyncio.gather(*commits)
+
+
+async def load_stored_comments(db: AsyncClient, analysis_id: str) -> list[dict]:
+    """Read stored comments back in their original order"""
+    comments = []
+    async for doc in _comments_ref(db, analysis_id).order_by("position").stream():
+        comment = doc.to_dict()
+        comment.pop("position", None)
+        comments.append(comment)
+    return comments
+
+
+async def with_stored_comments(db: AsyncClient, analysis_id: str, analysis_data: dict) -> dict:
+    """Fill in stored_comments for documents written with the subcollection layout"""
+    if "stored_comments" not in analysis_data:
+        analysis_data["stored_comments"] = await load_stored_comments(db, analysis_id)
+    return analysis_data
+
+
+async def delete_documents(db: AsyncClient, refs: list) -> int:
+    """Delete documents with one batched commit per WRITE_BATCH_LIMIT refs"""
+    commits = []
+    for start in range(0, len(refs), WRITE_BATCH_LIMIT):
+        batch = db.batch()
+        for ref in refs[start:start + WRITE_BATCH_LIMIT]:
+            batch.delete(ref)
+        commits.append(batch.commit())
+
+    await asyncio.gather(*commits)
+    return len(refs)
+
+
+async def delete_stored_comments(db: AsyncClient, analysis_id: str) -> int:
+    """Delete an analysis' stored comments, returns how many were removed"""
+    refs = [doc.reference async for doc in _comments_ref(db, analysis_id).select([]).stream()]
+    return await delete_documents(db, refs)
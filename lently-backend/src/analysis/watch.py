@@ -0,0 +1,49 @@
+"""
+Firestore Document Watching
+Bridges a document listener (which fires on a Firestore background thread)
+onto the event loop, so writes made by other workers or replicas can be
+streamed to clients.
+"""
+
+import asyncio
+from typing import AsyncIterator, Optional
+
+from google.cloud.firestore import DocumentReference
+
+
+async def watch_document(doc_ref: DocumentReference, keepalive: float = 30.0) -> AsyncIterator[Optional[dict]]:
+    """
+    Yield the document's data each time it changes, starting with its current state.
+
+    Like AnalysisJob.updates, slow consumers skip straight to the latest
+    snapshot. Yields {} once the document is missing or deleted, and None
+    when nothing changed for `keepalive` seconds.
+    """
+    loop = asyncio.get_running_loop()
+    changed = asyncio.Event()
+    latest: dict = {}
+
+    def publish(data: dict):
+        nonlocal latest
+        latest = data
+        changed.set()
+
+    def on_snapshot(docs, _changes, _read_time):
+        data = (docs[0].to_dict() or {}) if docs and docs[0].exists else {}
+        try:
+            loop.call_soon_threadsafe(publish, data)
+        except RuntimeError:
+            pass  # Loop already closed (shutdown)
+
+    watch = doc_ref.on_snapshot(on_snapshot)
+    try:
+        while True:
+            try:
+                await asyncio.wait_for(changed.wait(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                yield None
+                continue
+            changed.clear()
+            yield latest
+    finally:
+        watch.unsubscribe()
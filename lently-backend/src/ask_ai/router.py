@@ -14,7 +14,7 @@ from src.ask_ai.schemas import (
 )
 from src.middleware.auth import get_current_user_with_plan
 from src.gemini.exceptions import GeminiError, RateLimitError, ContentFilteredError
-from src.billing.service import BillingService
+from src.billing.service import BillingService, get_billing_service
 from src.billing.schemas import UsageType
 
 router = APIRouter(prefix="/api/ask", tags=["Ask AI"])
@@ -24,7 +24,8 @@ router = APIRouter(prefix="/api/ask", tags=["Ask AI"])
 async def ask_question(
     request: AskQuestionRequest,
     user_data: dict = Depends(get_current_user_with_plan),
-    ask_ai: AskAIService = Depends(get_ask_ai_service)
+    ask_ai: AskAIService = Depends(get_ask_ai_service),
+    billing: BillingService = Depends(get_billing_service)
 ):
     """
     Ask a question about a video's comments
@@ -62,7 +63,6 @@ async def ask_question(
     user_plan = user_data.get("plan", "free")
     
     # Check question quota using billing service (single source of truth)
-    billing = BillingService()
     quota_check = await billing.check_quota(user_id, UsageType.AI_QUESTIONS, 1)
     
     if not quota_check.allowed:
@@ -3,6 +3,7 @@ Ask AI Service
 Handles conversational AI for answering creator questions about their comments
 """
 
+import asyncio
 import json
 import logging
 import uuid
@@ -10,7 +11,9 @@ import re
 from datetime import datetime
 from typing import Optional
 
-from src.firebase_init import get_firestore
+from src.firebase_init import get_firestore, get_async_firestore
+from src.analysis.storage import with_stored_comments
+from google.cloud.firestore import Increment
 from src.gemini.client import get_gemini_client, GeminiClient
 from src.gemini.prompts.ask_ai import ASK_AI_PROMPT, ASK_AI_CONTEXT_PROMPTS
 from src.gemini.prompts.system import LENTLY_SYSTEM_INSTRUCTION
@@ -574,8 +577,9 @@ class AskAIService:
         """Get the most recent analysis for a video"""
         try:
             # Query for the user's analysis of this video
+            db = get_async_firestore()
             analyses = (
-                self.db.collection("analyses")
+                db.collection("analyses")
                 .where("user_id", "==", user_id)
                 .where("video.video_id", "==", video_id)
                 .order_by("created_at", direction="DESCENDING")
@@ -583,8 +587,8 @@ class AskAIService:
                 .stream()
             )
             
-            for doc in analyses:
-                return doc.to_dict()
+            async for doc in analyses:
+                return await with_stored_comments(db, doc.id, doc.to_dict())
             
             return None
             
@@ -599,14 +603,19 @@ class AskAIService:
         """Get aggregated analysis data from all user's videos"""
         try:
             # Query for all user's analyses
+            db = get_async_firestore()
             analyses = (
-                self.db.collection("analyses")
+                db.collection("analyses")
                 .where("user_id", "==", user_id)
                 .order_by("created_at", direction="DESCENDING")
                 .stream()
             )
             
-            all_analyses = [doc.to_dict() for doc in analyses]
+            # Load each analysis' stored comments concurrently
+            all_analyses = await asyncio.gather(*[
+                with_stored_comments(db, doc.id, doc.to_dict())
+                async for doc in analyses
+            ])
             
             if not all_analyses:
                 return None
@@ -1054,16 +1063,12 @@ class AskAIService:
     async def _increment_question_usage(self, user_id: str):
         """Increment question usage count"""
         try:
+            # Server-side increment: no read, no lost updates between requests.
+            # update() raises NotFound for missing users, logged below.
             user_ref = self.db.collection("users").document(user_id)
-            user_doc = user_ref.get()
-            
-            if user_doc.exists:
-                current_usage = user_doc.to_dict().get("usage", {})
-                current_questions = current_usage.get("questionsUsed", 0)
-                
-                user_ref.update({
-                    "usage.questionsUsed": current_questions + 1
-                })
+            user_ref.update({
+                "usage.questionsUsed": Increment(1)
+            })
                 
         except Exception as e:
             logger.error(f"Error incrementing usage: {e}")
@@ -43,7 +43,7 @@ from .schemas import (
     BillingInfo,
     QuotaCheckResult,
 )
-from .service import BillingService, billing_service
+from .service import BillingService, billing_service, get_billing_service
 from .enforcement import (
     QuotaExceededError,
     require_video_quota,
@@ -64,6 +64,7 @@ __all__ = [
     "UsageType",
     "BillingService",
     "billing_service",
+    "get_billing_service",
     "BillingInfo",
     "QuotaCheckResult",
     "QuotaExceededError",
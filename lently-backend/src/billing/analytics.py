@@ -11,7 +11,7 @@ from typing import List, Dict, Optional
 from pydantic import BaseModel
 
 from ..firebase_init import get_firestore
-from ..billing.service import BillingService
+from ..billing.service import get_billing_service
 from ..billing.schemas import UsageType
 
 logger = logging.getLogger(__name__)
@@ -52,7 +52,7 @@ class UsageAnalyticsService:
     def __init__(self):
         """Initialize analytics service"""
         self.db = get_firestore()
-        self.billing_service = BillingService()
+        self.billing_service = get_billing_service()
     
     async def get_usage_analytics(
         self,
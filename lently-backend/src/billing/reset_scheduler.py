@@ -15,7 +15,7 @@ from typing import List, Dict
 from firebase_admin import firestore
 
 from ..firebase_init import get_firestore
-from ..billing.service import BillingService
+from ..billing.service import get_billing_service
 from ..billing.schemas import PlanId
 
 logger = logging.getLogger(__name__)
@@ -31,7 +31,7 @@ class UsageResetScheduler:
     def __init__(self):
         """Initialize scheduler"""
         self.db = get_firestore()
-        self.billing_service = BillingService()
+        self.billing_service = get_billing_service()
     
     async def reset_all_users(self) -> Dict[str, int]:
         """
@@ -29,7 +29,7 @@ from .schemas import (
     UsageResponse,
     QuotaCheckResult,
 )
-from .service import billing_service
+from .service import billing_service, get_paddle_client
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/api/billing", tags=["Billing"])
@@ -312,7 +312,6 @@ async def get_invoice_pdf(
     Returns:
         URL to the invoice PDF
     """
-    import httpx
     from src.config import get_settings
     
     settings = get_settings()
@@ -350,55 +349,55 @@ async def get_invoice_pdf(
         
         logger.debug(f"Calling Paddle API: {paddle_api_url}/transactions/{transaction_id}/invoice")
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{paddle_api_url}/transactions/{transaction_id}/invoice",
-                params={"disposition": disposition},
-                headers={
-                    "Authorization": f"Bearer {api_key}",
-                    "Content-Type": "application/json"
-                }
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                pdf_url = data.get("data", {}).get("url")
-                if pdf_url:
-                    logger.info(f"Generated invoice PDF URL for transaction {transaction_id}")
-                    return {"url": pdf_url}
-                else:
-                    logger.error(f"Paddle response missing URL: {data}")
-                    raise HTTPException(
-                        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                        detail="Failed to get invoice URL from Paddle"
-                    )
-            elif response.status_code == 404:
-                logger.warning(f"Invoice not found for transaction {transaction_id}")
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="Invoice not available for this transaction. Invoices are only available for completed or billed transactions."
-                )
-            elif response.status_code == 403:
-                # Authentication error
-                logger.error(f"Paddle API authentication error: {response.text}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Paddle API authentication error. Please check API key configuration."
-                )
-            elif response.status_code == 422:
-                # Invoice not available (e.g., zero-value transaction)
-                logger.warning(f"Invoice not available for transaction {transaction_id}: {response.text}")
-                raise HTTPException(
-                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-                    detail="Invoice not available for this transaction"
-                )
+        client = get_paddle_client()
+        response = await client.get(
+            f"{paddle_api_url}/transactions/{transaction_id}/invoice",
+            params={"disposition": disposition},
+            headers={
+                "Authorization": f"Bearer {api_key}",
+                "Content-Type": "application/json"
+            }
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            pdf_url = data.get("data", {}).get("url")
+            if pdf_url:
+                logger.info(f"Generated invoice PDF URL for transaction {transaction_id}")
+                return {"url": pdf_url}
             else:
-                logger.error(f"Paddle API error getting invoice: {response.status_code} - {response.text}")
+                logger.error(f"Paddle response missing URL: {data}")
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to get invoice from Paddle"
+                    detail="Failed to get invoice URL from Paddle"
                 )
-                
+        elif response.status_code == 404:
+            logger.warning(f"Invoice not found for transaction {transaction_id}")
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Invoice not available for this transaction. Invoices are only available for completed or billed transactions."
+            )
+        elif response.status_code == 403:
+            # Authentication error
+            logger.error(f"Paddle API authentication error: {response.text}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Paddle API authentication error. Please check API key configuration."
+            )
+        elif response.status_code == 422:
+            # Invoice not available (e.g., zero-value transaction)
+            logger.warning(f"Invoice not available for transaction {transaction_id}: {response.text}")
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Invoice not available for this transaction"
+            )
+        else:
+            logger.error(f"Paddle API error getting invoice: {response.status_code} - {response.text}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to get invoice from Paddle"
+            )
+            
     except HTTPException:
         raise
     except Exception as e:
@@ -9,6 +9,8 @@ This module is the authoritative source for:
 - Usage tracking structures
 """
 
+import json
+from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import Optional, Literal, Dict
 from datetime import datetime
@@ -57,67 +59,21 @@ class Plan(BaseModel):
 # PLAN DEFINITIONS - THE SINGLE SOURCE OF TRUTH
 # =============================================================================
 
-# Paddle Product ID (shared across all plans)
-PADDLE_PRODUCT_ID = "pro_01kf39qhdhcs0bn4ebkej9smz1"
+# Plan data (prices, limits, Paddle IDs) lives in plans.json so tooling can
+# read it without importing the app. Prices are in cents, and
+# ai_questions_per_month=999999 means unlimited.
+_PLANS_FILE = Path(__file__).with_name("plans.json")
+_PLANS_CONFIG = json.loads(_PLANS_FILE.read_text())
+
+# Paddle Product ID (shared across all paid plans)
+PADDLE_PRODUCT_ID: str = _PLANS_CONFIG["paddle_product_id"]
 
 PLANS: Dict[PlanId, Plan] = {
-    PlanId.FREE: Plan(
-        id=PlanId.FREE,
-        name="Free",
-        price_monthly=0,
-        price_yearly=0,
-        videos_per_month=1,
-        comments_per_video=100,
-        ai_questions_per_month=2,
-        priority_support=False,
-        custom_integrations=False,
-        unlimited_ai=False,
-    ),
-    PlanId.STARTER: Plan(
-        id=PlanId.STARTER,
-        name="Starter",
-        price_monthly=1900,  # $19.00
-        price_yearly=0,
-        videos_per_month=10,
-        comments_per_video=1000,
-        ai_questions_per_month=30,
-        priority_support=False,
-        custom_integrations=False,
-        unlimited_ai=False,
-        paddle_product_id=PADDLE_PRODUCT_ID,
-        paddle_price_id_monthly="pri_01kf39teej9gdfagqayr5sfg9n",
-        paddle_price_id_yearly=None,
-    ),
-    PlanId.PRO: Plan(
-        id=PlanId.PRO,
-        name="Pro",
-        price_monthly=3900,  # $39.00
-        price_yearly=0,
-        videos_per_month=20,
-        comments_per_video=3000,
-        ai_questions_per_month=75,
-        priority_support=True,
-        custom_integrations=False,
-        unlimited_ai=False,
-        paddle_product_id=PADDLE_PRODUCT_ID,
-        paddle_price_id_monthly="pri_01kfedypx5bebb3frsbbpwctsm",
-        paddle_price_id_yearly=None,
-    ),
-    PlanId.BUSINESS: Plan(
-        id=PlanId.BUSINESS,
-        name="Business",
-        price_monthly=7900,  # $79.00
-        price_yearly=0,
-        videos_per_month=50,
-        comments_per_video=10000,
-        ai_questions_per_month=999999,  # Unlimited
-        priority_support=True,
-        custom_integrations=True,
-        unlimited_ai=True,
-        paddle_product_id=PADDLE_PRODUCT_ID,
-        paddle_price_id_monthly="pri_01kf39w2f25tg4qeb5zja3ngdk",
-        paddle_price_id_yearly=None,
-    ),
+    PlanId(entry["id"]): Plan(
+        **entry,
+        paddle_product_id=PADDLE_PRODUCT_ID if entry.get("paddle_price_id_monthly") else None,
+    )
+    for entry in _PLANS_CONFIG["plans"]
 }
 
 
@@ -10,6 +10,7 @@ This service handles:
 ALL billing-related logic goes through this service to ensure consistency.
 """
 
+import asyncio
 import logging
 import hashlib
 import hmac
@@ -20,6 +21,7 @@ import httpx
 
 from src.firebase_init import get_firestore
 from src.config import get_settings
+from src.cache.local import LocalTTLCache
 from .schemas import (
     PlanId,
     Plan,
@@ -38,6 +40,16 @@ from .schemas import (
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Subscriptions are read on every analysis request but change rarely
+# (webhooks, cancellations), so keep them briefly in-process.
+SUBSCRIPTION_CACHE_TTL = 60
+_subscription_cache = LocalTTLCache(maxsize=10000, ttl=SUBSCRIPTION_CACHE_TTL)
+
+# Usage as last read or written by this process. Quota checks that it proves
+# allowed skip Firestore; anything else is re-checked against a fresh read.
+USAGE_CACHE_TTL = 60
+_usage_cache = LocalTTLCache(maxsize=10000, ttl=USAGE_CACHE_TTL)
+
 
 class BillingService:
     """
@@ -86,7 +98,12 @@ class BillingService:
         """
         Get user's current subscription from Firestore.
         Returns a FREE subscription if none exists.
+        Cached per user for SUBSCRIPTION_CACHE_TTL seconds.
         """
+        cached = _subscription_cache.get(user_id)
+        if cached is not None:
+            return cached.model_copy()  # callers may mutate it
+        
         try:
             db = get_firestore()
             sub_ref = db.collection("users").document(user_id).collection("billing").document("subscription")
@@ -101,14 +118,17 @@ class BillingService:
                             pass  # Already datetime
                         elif isinstance(data[field], str):
                             data[field] = datetime.fromisoformat(data[field].replace('Z', '+00:00'))
-                return Subscription(**data)
+                subscription = Subscription(**data)
+            else:
+                # No subscription - return free plan
+                subscription = Subscription(
+                    plan_id=PlanId.FREE,
+                    status=SubscriptionStatus.NONE,
+                    billing_cycle="none"
+                )
             
-            # No subscription - return free plan
-            return Subscription(
-                plan_id=PlanId.FREE,
-                status=SubscriptionStatus.NONE,
-                billing_cycle="none"
-            )
+            _subscription_cache.set(user_id, subscription.model_copy())
+            return subscription
         except Exception as e:
             logger.error(f"Error getting subscription for user {user_id}: {e}")
             return Subscription(plan_id=PlanId.FREE, status=SubscriptionStatus.NONE)
@@ -144,6 +164,7 @@ class BillingService:
                         usage_ref.update({"videos_analyzed": Increment(actual_count)})
                         usage.videos_analyzed = actual_count
                 
+                _usage_cache.set(user_id, usage.model_copy())
                 return usage
             
             # No usage record - create default based on free plan
@@ -169,6 +190,7 @@ class BillingService:
             
             # Save default usage
             usage_ref.set(self._usage_to_dict(usage))
+            _usage_cache.set(user_id, usage.model_copy())
             return usage
             
         except Exception as e:
@@ -271,9 +293,20 @@ class BillingService:
         """
         Check if user has quota available for an action.
         This is the ENFORCEMENT point - all features must call this.
+        Served from the usage cache when it shows quota is available.
         """
-        usage = await self.get_user_usage(user_id)
+        cached = _usage_cache.get(user_id)
+        if cached is not None:
+            result = self._quota_result(cached, usage_type, amount)
+            if result.allowed:
+                return result
         
+        usage = await self.get_user_usage(user_id)
+        return self._quota_result(usage, usage_type, amount)
+    
+    @staticmethod
+    def _quota_result(usage: Usage, usage_type: UsageType, amount: int) -> QuotaCheckResult:
+        """Evaluate a quota check against a usage record"""
         if usage_type == UsageType.VIDEOS:
             current = usage.videos_analyzed
             limit = usage.videos_limit
@@ -314,6 +347,78 @@ class BillingService:
             upgrade_required=not allowed
         )
     
+    async def try_consume_quota(
+        self,
+        user_id: str,
+        usage_type: UsageType,
+        amount: int = 1
+    ) -> QuotaCheckResult:
+        """
+        Check quota and, if allowed, consume it in one Firestore transaction.
+        Concurrent requests can't both pass the check for the last credit.
+        Call refund_usage if the action then fails.
+        """
+        counter_fields = {
+            UsageType.VIDEOS: ("videos_analyzed", "videos_limit"),
+            UsageType.AI_QUESTIONS: ("ai_questions_used", "ai_questions_limit"),
+        }
+        if usage_type not in counter_fields:
+            return await self.check_quota(user_id, usage_type, amount)
+        counter, limit_field = counter_fields[usage_type]
+        
+        from google.cloud import firestore
+        
+        db = get_firestore()
+        usage_ref = db.collection("users").document(user_id).collection("billing").document("usage")
+        
+        @firestore.transactional
+        def consume(transaction) -> Optional[Usage]:
+            snapshot = usage_ref.get(transaction=transaction)
+            if not snapshot.exists:
+                return None
+            data = snapshot.to_dict()
+            usage = Usage(**{counter: data.get(counter, 0), limit_field: data.get(limit_field, 0)})
+            if self._quota_result(usage, usage_type, amount).allowed:
+                transaction.update(usage_ref, {counter: getattr(usage, counter) + amount})
+            return usage
+        
+        # The sync transaction reads, commits and may retry on contention,
+        # so it runs in a worker thread instead of blocking the loop
+        try:
+            usage = await asyncio.to_thread(consume, db.transaction())
+            if usage is None:
+                # First action of a new user: create the usage record, then retry
+                await self.get_user_usage(user_id)
+                usage = await asyncio.to_thread(consume, db.transaction())
+        except Exception as e:
+            logger.error(f"Error consuming quota for user {user_id}: {e}")
+            usage = None
+        
+        if usage is None:
+            # Nothing was consumed: fail closed rather than let the action
+            # run uncharged and then be refunded
+            return QuotaCheckResult(
+                allowed=False,
+                usage_type=usage_type,
+                current=0,
+                limit=0,
+                remaining=0,
+                message="We couldn't check your usage right now. Please try again."
+            )
+        
+        result = self._quota_result(usage, usage_type, amount)
+        if result.allowed:
+            _usage_cache.pop(user_id)
+            logger.info(f"Consumed {amount} {usage_type.value} for user {user_id}")
+        return result
+    
+    async def refund_usage(self, user_id: str, usage_type: UsageType, amount: int = 1):
+        """Give back quota taken by try_consume_quota when the action failed"""
+        try:
+            await self.increment_usage_bulk(user_id, {usage_type: -amount})
+        except Exception as e:
+            logger.warning(f"Failed to refund {usage_type.value} for user {user_id}: {e}")
+    
     async def increment_usage(
         self, 
         user_id: str, 
@@ -324,6 +429,17 @@ class BillingService:
         Increment usage counter after a successful action.
         Called AFTER the action completes, not before.
         """
+        return await self.increment_usage_bulk(user_id, {usage_type: amount})
+    
+    async def increment_usage_bulk(
+        self,
+        user_id: str,
+        amounts: dict[UsageType, int]
+    ) -> Usage:
+        """
+        Increment several usage counters in a single Firestore write.
+        Either all counters move or none do.
+        """
         try:
             db = get_firestore()
             usage_ref = db.collection("users").document(user_id).collection("billing").document("usage")
@@ -334,11 +450,16 @@ class BillingService:
                 UsageType.COMMENTS: "comments_analyzed",
             }
             
-            field = field_map.get(usage_type)
-            if field:
-                from google.cloud.firestore import Increment
-                usage_ref.update({field: Increment(amount)})
-                logger.info(f"Incremented {field} by {amount} for user {user_id}")
+            from google.cloud.firestore import Increment
+            updates = {
+                field_map[usage_type]: Increment(amount)
+                for usage_type, amount in amounts.items()
+                if usage_type in field_map and amount
+            }
+            if updates:
+                usage_ref.update(updates)
+                _usage_cache.pop(user_id)
+                logger.info(f"Incremented {', '.join(updates)} for user {user_id}")
             
             return await self.get_user_usage(user_id)
             
@@ -370,6 +491,7 @@ class BillingService:
             db = get_firestore()
             usage_ref = db.collection("users").document(user_id).collection("billing").document("usage")
             usage_ref.set(self._usage_to_dict(usage))
+            _usage_cache.set(user_id, usage.model_copy())
             
             logger.info(f"Reset usage for user {user_id}")
             return usage
@@ -415,6 +537,7 @@ class BillingService:
                 "comments_limit": usage.comments_limit,
                 "ai_questions_limit": usage.ai_questions_limit,
             })
+            _usage_cache.set(user_id, usage.model_copy())
             
             # Log new state after update
             logger.info(f"  New limits: {usage.videos_analyzed}/{usage.videos_limit} videos, "
@@ -454,6 +577,7 @@ class BillingService:
             subscription_data["updated_at"] = datetime.utcnow().isoformat()
             
             sub_ref.set(subscription_data, merge=True)
+            _subscription_cache.pop(user_id)
             logger.info(f"Updated subscription for user {user_id}")
             
             return await self.get_user_subscription(user_id)
@@ -489,21 +613,20 @@ class BillingService:
         )
         
         if should_call_paddle:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.PADDLE_API_URL}/subscriptions/{subscription.paddle_subscription_id}/cancel",
-                    headers={
-                        "Authorization": f"Bearer {settings.paddle_api_key}",
-                        "Content-Type": "application/json"
-                    },
-                    json={
-                        "effective_from": "next_billing_period" if at_period_end else "immediately"
-                    }
-                )
-                
-                if response.status_code not in [200, 202]:
-                    logger.error(f"Paddle cancel failed: {response.text}")
-                    raise ValueError(f"Failed to cancel subscription: {response.text}")
+            response = await get_paddle_client().post(
+                f"{self.PADDLE_API_URL}/subscriptions/{subscription.paddle_subscription_id}/cancel",
+                headers={
+                    "Authorization": f"Bearer {settings.paddle_api_key}",
+                    "Content-Type": "application/json"
+                },
+                json={
+                    "effective_from": "next_billing_period" if at_period_end else "immediately"
+                }
+            )
+            
+            if response.status_code not in [200, 202]:
+                logger.error(f"Paddle cancel failed: {response.text}")
+                raise ValueError(f"Failed to cancel subscription: {response.text}")
         else:
             logger.info(f"Skipping Paddle API call for sandbox/test subscription: {subscription.paddle_subscription_id}")
         
@@ -601,5 +724,33 @@ class BillingService:
         }
 
 
+# Shared Paddle HTTP client so API calls reuse pooled keep-alive connections
+_paddle_client: Optional[httpx.AsyncClient] = None
+
+
+def get_paddle_client() -> httpx.AsyncClient:
+    """Get or create the shared Paddle HTTP client"""
+    global _paddle_client
+    if _paddle_client is None or _paddle_client.is_closed:
+        _paddle_client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20)
+        )
+    return _paddle_client
+
+
+async def close_paddle_client():
+    """Close the shared Paddle HTTP client (on shutdown)"""
+    global _paddle_client
+    if _paddle_client is not None:
+        await _paddle_client.aclose()
+        _paddle_client = None
+
+
 # Singleton instance
 billing_service = BillingService()
+
+
+def get_billing_service() -> BillingService:
+    """Get billing service singleton (usable as a FastAPI dependency)"""
+    return billing_service
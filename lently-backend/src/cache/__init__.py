@@ -14,6 +14,7 @@ Reduces API calls and improves response times.
 from .client import get_redis_client, RedisClient
 from .service import CacheService, get_cache_service
 from .keys import CacheKeys, CacheTTL
+from .local import LocalTTLCache
 
 __all__ = [
     "get_redis_client",
@@ -22,4 +23,5 @@ __all__ = [
     "get_cache_service",
     "CacheKeys",
     "CacheTTL",
+    "LocalTTLCache",
 ]
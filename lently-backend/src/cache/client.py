@@ -42,7 +42,7 @@ class RedisClient:
                 host=settings.redis_host,
                 port=settings.redis_port,
                 password=settings.redis_password if settings.redis_password else None,
-                decode_responses=True,  # Auto-decode bytes to strings
+                decode_responses=False,  # Values are JSON bytes (see CacheService)
                 max_connections=20,
                 socket_connect_timeout=5,
                 socket_timeout=5,
@@ -70,7 +70,7 @@ class RedisClient:
             await self.redis.close()
             logger.info("Redis connection closed")
     
-    async def get(self, key: str) -> Optional[str]:
+    async def get(self, key: str) -> Optional[bytes]:
         """
         Get value from Redis.
         
@@ -97,7 +97,7 @@ class RedisClient:
     async def set(
         self,
         key: str,
-        value: str,
+        value: bytes,
         ttl: Optional[int] = None
     ) -> bool:
         """
@@ -125,6 +125,45 @@ class RedisClient:
             logger.warning(f"Redis SET error for {key}: {e}")
             return False
     
+    async def set_and_index(
+        self,
+        key: str,
+        value: bytes,
+        index_key: str,
+        member: str,
+        ttl: int
+    ) -> bool:
+        """
+        Set a value and add it to an index set in one round trip.
+        
+        Queues SETEX, SADD and EXPIRE on a non-transactional pipeline.
+        The index TTL is refreshed so it lives as long as its newest entry.
+        
+        Args:
+            key: Cache key
+            value: Value to store
+            index_key: Key of the Redis set tracking related keys
+            member: Member to add to the index set
+            ttl: Time to live in seconds for both keys
+        
+        Returns:
+            True if set successfully
+        """
+        if not self.enabled or not self.redis:
+            return False
+        
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.setex(key, ttl, value)
+                pipe.sadd(index_key, member)
+                pipe.expire(index_key, ttl)
+                await pipe.execute()
+            logger.debug(f"Cache SET: {key} (TTL: {ttl}s, index: {index_key})")
+            return True
+        except Exception as e:
+            logger.warning(f"Redis pipelined SET error for {key}: {e}")
+            return False
+    
     async def delete(self, key: str) -> bool:
         """
         Delete key from Redis.
@@ -146,6 +185,46 @@ class RedisClient:
             logger.warning(f"Redis DELETE error for {key}: {e}")
             return False
     
+    async def unlink(self, *keys: str) -> int:
+        """
+        Delete keys without blocking Redis on freeing large values.
+        
+        Args:
+            keys: Cache keys to delete
+        
+        Returns:
+            Number of keys deleted
+        """
+        if not self.enabled or not self.redis or not keys:
+            return 0
+        
+        try:
+            deleted = await self.redis.unlink(*keys)
+            logger.debug(f"Cache UNLINK: {len(keys)} keys ({deleted} existed)")
+            return deleted
+        except Exception as e:
+            logger.warning(f"Redis UNLINK error: {e}")
+            return 0
+    
+    async def members(self, key: str) -> list[str]:
+        """
+        Get all members of a set.
+        
+        Args:
+            key: Set key
+        
+        Returns:
+            Members as strings (empty if missing)
+        """
+        if not self.enabled or not self.redis:
+            return []
+        
+        try:
+            return [m.decode() for m in await self.redis.smembers(key)]
+        except Exception as e:
+            logger.warning(f"Redis SMEMBERS error for {key}: {e}")
+            return []
+    
     async def delete_pattern(self, pattern: str) -> int:
         """
         Delete all keys matching pattern.
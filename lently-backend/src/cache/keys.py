@@ -20,6 +20,7 @@ class CacheKeys:
     PREFIX_USER = "user"
     PREFIX_QUOTA = "quota"
     PREFIX_TRANSCRIPT = "transcript"
+    PREFIX_GEMINI = "gemini"
     
     @staticmethod
     def analysis(analysis_id: str) -> str:
@@ -93,6 +94,24 @@ class CacheKeys:
         """Pattern to match all transcript cache keys"""
         return f"{CacheKeys.PREFIX_TRANSCRIPT}:*"
     
+    @staticmethod
+    def gemini_response(fingerprint: str) -> str:
+        """
+        Cache key for a parsed Gemini JSON response.
+        
+        Args:
+            fingerprint: Hash of the model, system instruction and prompt
+        
+        Returns:
+            Cache key (e.g., "gemini:9f86d081...")
+        """
+        return f"{CacheKeys.PREFIX_GEMINI}:{fingerprint}"
+    
+    @staticmethod
+    def gemini_pattern() -> str:
+        """Pattern to match all Gemini response cache keys"""
+        return f"{CacheKeys.PREFIX_GEMINI}:*"
+    
     @staticmethod
     def user_quota(user_id: str) -> str:
         """
@@ -106,6 +125,19 @@ class CacheKeys:
         """
         return f"{CacheKeys.PREFIX_QUOTA}:{user_id}"
     
+    @staticmethod
+    def user_analyses(user_id: str) -> str:
+        """
+        Cache key for the set of analysis IDs cached for a user.
+        
+        Args:
+            user_id: Firebase user ID
+        
+        Returns:
+            Cache key (e.g., "user:user123:analyses")
+        """
+        return f"{CacheKeys.PREFIX_USER}:{user_id}:analyses"
+    
     @staticmethod
     def user_pattern(user_id: str) -> str:
         """
@@ -152,6 +184,9 @@ class CacheTTL:
     # Transcript - 2 hours (rarely changes)
     TRANSCRIPT = 7200
     
+    # Gemini responses - 7 days (same prompt, same answer)
+    GEMINI_RESPONSE = 7 * 86400
+    
     # User quota - 5 minutes (changes frequently)
     QUOTA = 300
     
@@ -0,0 +1,84 @@
+"""
+In-Process Cache
+================
+
+Small bounded TTL cache kept in front of Redis for hot keys that are
+read repeatedly by the same worker (e.g. a dashboard polling one analysis).
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+
+class LocalTTLCache:
+    """
+    Bounded in-memory cache with per-entry expiry.
+
+    Entries expire `ttl` seconds after they were stored. When full, the
+    least recently used entry is evicted. Not shared between processes,
+    so keep the TTL short.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30):
+        """
+        Initialize local cache.
+
+        Args:
+            maxsize: Maximum number of entries
+            ttl: Seconds an entry stays valid
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Get a live entry.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if missing/expired
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        """
+        Store an entry, evicting the least recently used one if full.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def pop(self, key: str):
+        """
+        Remove an entry if present.
+
+        Args:
+            key: Cache key
+        """
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all entries"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
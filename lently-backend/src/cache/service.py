@@ -5,11 +5,13 @@ Cache Service
 High-level caching operations with JSON serialization.
 """
 
-import json
 import logging
+import zlib
 from typing import Any, Optional, TypeVar, Generic
 from datetime import datetime
 
+import orjson
+
 from .client import RedisClient, get_redis_client
 from .keys import CacheKeys, CacheTTL
 
@@ -17,10 +19,42 @@ logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+# Non-str dict keys are coerced like json.dumps does; datetimes use orjson's
+# native ISO encoding and anything else unknown falls back to str()
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+# Payloads above this size are zlib-compressed; a 1-byte header marks the
+# format. Entries written before framing start with JSON and are read as-is.
+COMPRESS_THRESHOLD = 4096
+COMPRESS_LEVEL = 3
+_FLAG_RAW = b"\x00"
+_FLAG_ZLIB = b"\x01"
+
+
+def _encode(value: Any) -> bytes:
+    """Serialize a cache value to framed (optionally compressed) JSON bytes"""
+    payload = orjson.dumps(value, default=str, option=_ORJSON_OPTIONS)
+    if len(payload) > COMPRESS_THRESHOLD:
+        return _FLAG_ZLIB + zlib.compress(payload, COMPRESS_LEVEL)
+    return _FLAG_RAW + payload
+
+
+def _decode(raw: bytes | str) -> Any:
+    """Deserialize a value written by _encode (or a legacy plain JSON value)"""
+    if isinstance(raw, str):
+        raw = raw.encode()
+    flag = raw[:1]
+    if flag == _FLAG_ZLIB:
+        return orjson.loads(zlib.decompress(raw[1:]))
+    if flag == _FLAG_RAW:
+        return orjson.loads(raw[1:])
+    return orjson.loads(raw)
+
 
 class CacheService(Generic[T]):
     """
-    Generic cache service with JSON serialization.
+    Generic cache service with JSON serialization (orjson).
     
     Provides high-level caching operations that handle JSON
     serialization/deserialization automatically.
@@ -64,12 +98,12 @@ class CacheService(Generic[T]):
             
             if value:
                 self.stats["hits"] += 1
-                return json.loads(value)
+                return _decode(value)
             else:
                 self.stats["misses"] += 1
                 return None
                 
-        except json.JSONDecodeError as e:
+        except (orjson.JSONDecodeError, zlib.error) as e:
             logger.error(f"Cache JSON decode error for {key}: {e}")
             self.stats["errors"] += 1
             return None
@@ -97,7 +131,7 @@ class CacheService(Generic[T]):
         """
         try:
             client = await self._get_client()
-            serialized = json.dumps(value, default=str)  # default=str handles datetime
+            serialized = _encode(value)
             success = await client.set(key, serialized, ttl=ttl)
             
             if success:
@@ -113,6 +147,45 @@ class CacheService(Generic[T]):
             self.stats["errors"] += 1
             return False
     
+    async def set_indexed(
+        self,
+        key: str,
+        value: dict,
+        index_key: str,
+        member: str,
+        ttl: int = CacheTTL.MEDIUM
+    ) -> bool:
+        """
+        Serialize and store value, and record it in an index set.
+        
+        Args:
+            key: Cache key
+            value: Value to cache (must be JSON-serializable)
+            index_key: Key of the index set (e.g., a user's analyses)
+            member: Member to add to the index set
+            ttl: Time to live in seconds
+        
+        Returns:
+            True if cached successfully
+        """
+        try:
+            client = await self._get_client()
+            serialized = _encode(value)
+            success = await client.set_and_index(key, serialized, index_key, member, ttl)
+            
+            if success:
+                self.stats["sets"] += 1
+            return success
+            
+        except (TypeError, ValueError) as e:
+            logger.error(f"Cache JSON encode error for {key}: {e}")
+            self.stats["errors"] += 1
+            return False
+        except Exception as e:
+            logger.error(f"Cache SET error for {key}: {e}")
+            self.stats["errors"] += 1
+            return False
+    
     async def delete(self, key: str) -> bool:
         """
         Delete key from cache.
@@ -154,6 +227,31 @@ class CacheService(Generic[T]):
             self.stats["errors"] += 1
             return 0
     
+    async def invalidate_index(self, index_key: str, key_fn) -> int:
+        """
+        Delete every entry recorded in an index set, and the set itself.
+        
+        Costs O(entries in the index) instead of a keyspace SCAN.
+        
+        Args:
+            index_key: Key of the index set
+            key_fn: Maps an index member to its cache key
+        
+        Returns:
+            Number of entries deleted (excluding the index itself)
+        """
+        try:
+            client = await self._get_client()
+            keys = [key_fn(member) for member in await client.members(index_key)]
+            deleted = await client.unlink(*keys, index_key)
+            count = max(deleted - 1, 0) if keys else 0
+            self.stats["deletes"] += count
+            return count
+        except Exception as e:
+            logger.error(f"Cache index invalidation error for {index_key}: {e}")
+            self.stats["errors"] += 1
+            return 0
+    
     async def exists(self, key: str) -> bool:
         """Check if key exists in cache"""
         try:
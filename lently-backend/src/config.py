@@ -34,6 +34,7 @@ class Settings(BaseSettings):
     
     # Rate Limiting
     rate_limit_enabled: bool = True
+    max_concurrent_analyses: int = 10  # Per process; extra analyses wait queued
     
     # Cloud Pub/Sub
     pubsub_analysis_topic: str = "analysis-jobs"
@@ -4,7 +4,7 @@ Handles authentication and Firestore database connection
 """
 
 import firebase_admin
-from firebase_admin import credentials, auth, firestore
+from firebase_admin import credentials, auth, firestore, firestore_async
 from functools import lru_cache
 import os
 from src.config import get_settings
@@ -49,6 +49,14 @@ def get_firestore() -> firestore.Client:
     
     return _firestore_client
 
+@lru_cache()
+def get_async_firestore() -> firestore_async.AsyncClient:
+    """Get async Firestore client instance (for use inside coroutines)"""
+    if _firebase_app is None:
+        initialize_firebase()
+    
+    return firestore_async.client()
+
 def verify_firebase_token(id_token: str) -> dict:
     """
     Verify Firebase ID token and return decoded token
@@ -3,11 +3,14 @@ Gemini AI module
 """
 
 from src.gemini.client import GeminiClient, get_gemini_client
+from src.gemini.cached_client import CachedGeminiClient, get_cached_gemini_client
 from src.gemini.exceptions import GeminiError, ContentFilteredError, RateLimitError
 
 __all__ = [
     'GeminiClient',
     'get_gemini_client',
+    'CachedGeminiClient',
+    'get_cached_gemini_client',
     'GeminiError',
     'ContentFilteredError',
     'RateLimitError',
@@ -0,0 +1,123 @@
+"""
+Gemini Response Caching
+=======================
+
+Caches parsed Gemini JSON responses in Redis, keyed on the exact prompt.
+Analysis prompts are built only from the video and its comments, so
+re-analyzing the same comments skips the Gemini call entirely.
+"""
+
+import hashlib
+import logging
+from typing import Optional
+
+from src.gemini.client import GeminiClient, get_gemini_client
+from src.gemini.config import GEMINI_MODEL, GENERATION_CONFIG
+from src.cache import CacheService, get_cache_service, CacheKeys, CacheTTL
+
+logger = logging.getLogger(__name__)
+
+
+def prompt_fingerprint(
+    prompt: str,
+    system_instruction: Optional[str] = None,
+    max_tokens: Optional[int] = None
+) -> str:
+    """
+    Hash everything that determines a Gemini response.
+
+    Args:
+        prompt: The prompt text
+        system_instruction: Custom system instruction, if any
+        max_tokens: Max output tokens override, if any
+
+    Returns:
+        Hex digest identifying the request
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for part in (GEMINI_MODEL, repr(sorted(GENERATION_CONFIG.items())),
+                 system_instruction or "", str(max_tokens or ""), prompt):
+        digest.update(part.encode())
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class CachedGeminiClient:
+    """
+    Gemini client with Redis caching for JSON generation.
+
+    Only successful, parsed responses are cached; errors always reach
+    the caller. When Redis is unavailable every call goes to Gemini.
+    """
+
+    def __init__(
+        self,
+        gemini: Optional[GeminiClient] = None,
+        cache_service: Optional[CacheService] = None,
+        ttl: int = CacheTTL.GEMINI_RESPONSE
+    ):
+        """
+        Initialize cached Gemini client.
+
+        Args:
+            gemini: Core Gemini client
+            cache_service: Redis cache service
+            ttl: How long a response is reused, in seconds
+        """
+        self.gemini = gemini
+        self.cache = cache_service
+        self.ttl = ttl
+
+    async def _get_services(self):
+        """Lazy initialize services"""
+        if self.gemini is None:
+            self.gemini = get_gemini_client()
+        if self.cache is None:
+            self.cache = await get_cache_service()
+
+    async def generate_json(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+    ) -> dict:
+        """
+        Generate structured JSON, reusing a cached response for the same prompt.
+
+        Args:
+            prompt: The prompt (should request JSON output)
+            system_instruction: Optional custom system instruction
+            max_tokens: Optional override for max output tokens
+
+        Returns:
+            Parsed JSON as dictionary
+        """
+        await self._get_services()
+
+        cache_key = CacheKeys.gemini_response(
+            prompt_fingerprint(prompt, system_instruction, max_tokens)
+        )
+        cached = await self.cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"✅ Cache HIT: Gemini response {cache_key}")
+            return cached
+
+        result = await self.gemini.generate_json(
+            prompt=prompt,
+            system_instruction=system_instruction,
+            max_tokens=max_tokens
+        )
+        await self.cache.set(cache_key, result, ttl=self.ttl)
+        return result
+
+
+# Singleton instance
+_cached_gemini_client: Optional[CachedGeminiClient] = None
+
+
+def get_cached_gemini_client() -> CachedGeminiClient:
+    """Get or create cached Gemini client singleton"""
+    global _cached_gemini_client
+    if _cached_gemini_client is None:
+        _cached_gemini_client = CachedGeminiClient(get_gemini_client())
+    return _cached_gemini_client
@@ -6,6 +6,7 @@ Handles all interactions with the Gemini API
 import json
 import logging
 import asyncio
+import re
 from typing import Optional, Any
 
 import google.generativeai as genai
@@ -25,6 +26,10 @@ from src.gemini.prompts.system import LENTLY_SYSTEM_INSTRUCTION
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Standalone backslashes that aren't part of a valid JSON escape sequence
+# (valid: \n \t \r \b \f \" \\ \/), which the model sometimes emits in text
+_INVALID_ESCAPE = re.compile(r'\\(?![ntrfbv"\\/])')
+
 
 class GeminiClient:
     """
@@ -196,10 +201,7 @@ class GeminiClient:
             
             # Try to fix common escape sequence issues
             # This handles cases where AI generates text with single backslashes
-            import re
-            # Replace standalone backslashes that aren't part of valid escape sequences
-            # Valid: \n \t \r \b \f \" \\ \/
-            text = re.sub(r'\\(?![ntrfbv"\\/])', r'\\\\', text)
+            text = _INVALID_ESCAPE.sub(r'\\\\', text)
             
             return json.loads(text)
             
@@ -5,7 +5,9 @@ Gemini prompts module
 from src.gemini.prompts.system import LENTLY_SYSTEM_INSTRUCTION
 from src.gemini.prompts.analysis import (
     SENTIMENT_ANALYSIS_PROMPT,
+    SENTIMENT_BATCH_PROMPT,
     CLASSIFICATION_PROMPT,
+    CLASSIFICATION_BATCH_PROMPT,
     INSIGHTS_PROMPT,
     SUMMARY_PROMPT,
 )
@@ -15,7 +17,9 @@ from src.gemini.prompts.replies import REPLY_GENERATION_PROMPT
 __all__ = [
     'LENTLY_SYSTEM_INSTRUCTION',
     'SENTIMENT_ANALYSIS_PROMPT',
+    'SENTIMENT_BATCH_PROMPT',
     'CLASSIFICATION_PROMPT',
+    'CLASSIFICATION_BATCH_PROMPT',
     'INSIGHTS_PROMPT',
     'SUMMARY_PROMPT',
     'ASK_AI_PROMPT',
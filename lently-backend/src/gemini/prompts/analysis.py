@@ -2,7 +2,18 @@
 Analysis Prompts for Comment Processing
 """
 
-SENTIMENT_ANALYSIS_PROMPT = """Analyze the sentiment of these YouTube comments with high accuracy.
+
+def render_comments_prompt(template: str, **fields) -> tuple[str, str]:
+    """
+    Render a batch prompt around its {comments_json} slot.
+    
+    Returns (head, tail) so callers can build each batch prompt with
+    head + comments_json + tail instead of re-formatting the template.
+    """
+    head, tail = template.split("{comments_json}")
+    return head.format(**fields), tail.format()
+
+_SENTIMENT_INSTRUCTIONS = """Analyze the sentiment of these YouTube comments with high accuracy.
 
 ## VIDEO CONTEXT
 Title: {video_title}
@@ -47,7 +58,9 @@ Classify each comment's sentiment as:
 5. ALL CAPS often indicates strong emotion (usually frustration)
 6. Be precise - don't default to neutral if there's clear emotion
 
-## RESPONSE FORMAT (JSON)
+"""
+
+SENTIMENT_ANALYSIS_PROMPT = _SENTIMENT_INSTRUCTIONS + """## RESPONSE FORMAT (JSON)
 {{
   "comments": [
     {{"comment_id": "...", "sentiment": "positive", "confidence": 0.9, "emotion": "excited"}}
@@ -66,7 +79,18 @@ Classify each comment's sentiment as:
 Respond ONLY with valid JSON, no additional text."""
 
 
-CLASSIFICATION_PROMPT = """Classify these YouTube comments into categories.
+# Per-batch variant: labels only, the summary is aggregated client-side
+SENTIMENT_BATCH_PROMPT = _SENTIMENT_INSTRUCTIONS + """## RESPONSE FORMAT (JSON)
+{{
+  "comments": [
+    {{"comment_id": "...", "sentiment": "positive", "confidence": 0.9, "emotion": "excited"}}
+  ]
+}}
+
+Respond ONLY with valid JSON, no additional text."""
+
+
+_CLASSIFICATION_INSTRUCTIONS = """Classify these YouTube comments into categories.
 
 ## VIDEO CONTEXT
 Title: {video_title}
@@ -98,7 +122,9 @@ For each comment:
 2. Optionally assign a secondary_category if relevant
 3. Rate your confidence 0.0-1.0
 
-## RESPONSE FORMAT (JSON)
+"""
+
+CLASSIFICATION_PROMPT = _CLASSIFICATION_INSTRUCTIONS + """## RESPONSE FORMAT (JSON)
 {{
   "comments": [
     {{"comment_id": "...", "primary_category": "question", "secondary_category": "suggestion", "confidence": 0.85}}
@@ -114,6 +140,17 @@ For each comment:
 Respond ONLY with valid JSON, no additional text."""
 
 
+# Per-batch variant: labels only, the summary is aggregated client-side
+CLASSIFICATION_BATCH_PROMPT = _CLASSIFICATION_INSTRUCTIONS + """## RESPONSE FORMAT (JSON)
+{{
+  "comments": [
+    {{"comment_id": "...", "primary_category": "question", "secondary_category": "suggestion", "confidence": 0.85}}
+  ]
+}}
+
+Respond ONLY with valid JSON, no additional text."""
+
+
 INSIGHTS_PROMPT = """Extract actionable insights from these YouTube comments.
 
 ## VIDEO CONTEXT (CRITICAL - ALL INSIGHTS MUST RELATE TO THIS)
@@ -1,5 +1,6 @@
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from src.config import get_settings
 from src.firebase_init import initialize_firebase
@@ -7,11 +8,15 @@ from src.middleware.router import router as user_router
 from src.middleware.auth import get_current_user, AuthenticatedUser
 from src.youtube.router import router as youtube_router
 from src.gemini.router import router as gemini_router
-from src.analysis.router import router as analysis_router
+from src.analysis.router import router as analysis_router, cancel_running_analyses
 from src.ask_ai.router import router as ask_ai_router
 from src.billing.router import router as billing_router
 from src.cache.router import router as cache_router
 from src.cache import get_redis_client
+from src.analysis.background_service import flush_pending_writes
+from src.analysis.progress import get_progress_manager
+from src.billing.service import close_paddle_client
+import asyncio
 import logging
 
 settings = get_settings()
@@ -47,9 +52,17 @@ async def lifespan(app: FastAPI):
         logger.warning(f"⚠️  Redis initialization failed: {e}")
         logger.warning("   Continuing without Redis (caching disabled)")
     
+    # Periodically drop finished analysis jobs from memory
+    cleanup_task = asyncio.create_task(get_progress_manager().start_cleanup_loop())
+    
     yield
     
     # Cleanup
+    cleanup_task.cancel()
+    await cancel_running_analyses()
+    await flush_pending_writes()
+    await close_paddle_client()
+    
     try:
         redis_client = await get_redis_client()
         await redis_client.disconnect()
@@ -63,7 +76,8 @@ app = FastAPI(
     title="Lently Backend API",
     description="YouTube Comment Analysis Service",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS Configuration
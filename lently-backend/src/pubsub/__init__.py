@@ -11,7 +11,7 @@ from .schemas import (
     AnalysisJobResult,
     JobStatusUpdate,
 )
-from .publisher import JobPublisher
+from .publisher import JobPublisher, get_job_publisher
 from .worker import AnalysisWorker
 
 __all__ = [
@@ -20,5 +20,6 @@ __all__ = [
     "AnalysisJobResult",
     "JobStatusUpdate",
     "JobPublisher",
+    "get_job_publisher",
     "AnalysisWorker",
 ]
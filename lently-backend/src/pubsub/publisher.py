@@ -226,3 +226,15 @@ class JobPublisher:
         await self._update_job_status(job_id, AnalysisJobStatus.CANCELLED)
         logger.info(f"Cancelled job {job_id}")
         return True
+
+
+# Singleton instance
+_job_publisher: Optional[JobPublisher] = None
+
+
+def get_job_publisher() -> JobPublisher:
+    """Get or create job publisher singleton"""
+    global _job_publisher
+    if _job_publisher is None:
+        _job_publisher = JobPublisher()
+    return _job_publisher
@@ -3,13 +3,16 @@ YouTube API Service - Fetches video metadata and comments
 Optimized to retrieve the most valuable, actionable comments for creators
 """
 
+import asyncio
 import logging
 import re
 import html
+import threading
 from datetime import datetime
 from typing import Optional
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
+from googleapiclient.http import build_http
 
 from src.config import get_settings
 from src.youtube.schemas import (
@@ -29,6 +32,42 @@ from src.billing.schemas import get_plan
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+_VIDEO_ID_PATTERNS = [
+    re.compile(r'(?:youtube\.com\/watch\?v=)([a-zA-Z0-9_-]{11})'),
+    re.compile(r'(?:youtu\.be\/)([a-zA-Z0-9_-]{11})'),
+    re.compile(r'(?:youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})'),
+    re.compile(r'(?:youtube\.com\/v\/)([a-zA-Z0-9_-]{11})'),
+    re.compile(r'(?:youtube\.com\/shorts\/)([a-zA-Z0-9_-]{11})'),
+]
+_VIDEO_ID = re.compile(r'^[a-zA-Z0-9_-]{11}$')
+
+# httplib2 connections aren't thread-safe, so each worker thread keeps its own
+_thread_local = threading.local()
+
+
+def _execute(request) -> dict:
+    """Run an API request on the calling thread's own HTTP connection"""
+    http = getattr(_thread_local, "http", None)
+    if http is None:
+        http = _thread_local.http = build_http()
+    return request.execute(http=http)
+
+
+def extract_video_id(url_or_id: str) -> str:
+    """Extract video ID from various YouTube URL formats"""
+    url_or_id = url_or_id.strip()
+    
+    for pattern in _VIDEO_ID_PATTERNS:
+        match = pattern.search(url_or_id)
+        if match:
+            return match.group(1)
+    
+    # Check if it's already a valid video ID
+    if _VIDEO_ID.match(url_or_id):
+        return url_or_id
+    
+    raise InvalidVideoIdError(f"Cannot extract video ID from: {url_or_id}")
+
 
 class YouTubeService:
     """
@@ -48,26 +87,7 @@ class YouTubeService:
     
     def _extract_video_id(self, url_or_id: str) -> str:
         """Extract video ID from various YouTube URL formats"""
-        url_or_id = url_or_id.strip()
-        
-        patterns = [
-            r'(?:youtube\.com\/watch\?v=)([a-zA-Z0-9_-]{11})',
-            r'(?:youtu\.be\/)([a-zA-Z0-9_-]{11})',
-            r'(?:youtube\.com\/embed\/)([a-zA-Z0-9_-]{11})',
-            r'(?:youtube\.com\/v\/)([a-zA-Z0-9_-]{11})',
-            r'(?:youtube\.com\/shorts\/)([a-zA-Z0-9_-]{11})',
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url_or_id)
-            if match:
-                return match.group(1)
-        
-        # Check if it's already a valid video ID
-        if re.match(r'^[a-zA-Z0-9_-]{11}$', url_or_id):
-            return url_or_id
-        
-        raise InvalidVideoIdError(f"Cannot extract video ID from: {url_or_id}")
+        return extract_video_id(url_or_id)
     
     def _clean_html(self, text: str) -> str:
         """Remove HTML tags and decode entities"""
@@ -183,10 +203,11 @@ class YouTubeService:
     async def get_video_metadata(self, video_id: str) -> VideoMetadata:
         """Fetch video metadata from YouTube"""
         try:
-            response = self.youtube.videos().list(
+            # Blocking HTTP call, kept off the event loop
+            response = await asyncio.to_thread(_execute, self.youtube.videos().list(
                 part='snippet,statistics,contentDetails',
                 id=video_id
-            ).execute()
+            ))
             
             if not response.get('items'):
                 raise VideoNotFoundError(f"Video not found", video_id=video_id)
@@ -249,14 +270,15 @@ class YouTubeService:
             fetch_target = min(max_to_fetch * 3, 5000)
             
             while len(raw_comments) < fetch_target:
-                response = self.youtube.commentThreads().list(
+                # Blocking HTTP call, kept off the event loop
+                response = await asyncio.to_thread(_execute, self.youtube.commentThreads().list(
                     part='snippet',
                     videoId=video_id,
                     order=request.order.value,
                     maxResults=min(MAX_COMMENTS_PER_REQUEST, fetch_target - len(raw_comments)),
                     pageToken=next_page_token,
                     textFormat='plainText'
-                ).execute()
+                ))
                 
                 for item in response.get('items', []):
                     snippet = item['snippet']['topLevelComment']['snippet']
@@ -95,7 +95,81 @@ class TestAnalysisPipeline:
         assert result.comments_analyzed >= 2
         assert result.sentiment is not None
         assert result.classification is not None
-    
+
+    @pytest.mark.asyncio
+    async def test_sentiment_summary_covers_every_batch(self, mock_youtube_service):
+        """Test concurrent sentiment batches are merged into one summary"""
+        from types import SimpleNamespace
+        from src.analysis.service import BATCH_SIZE
+
+        comments = [
+            SimpleNamespace(comment_id=f"c{i}", author="User", text=f"Nice {i}", like_count=0, reply_count=0)
+            for i in range(BATCH_SIZE + 1)
+        ]
+
+        async def generate_json(prompt):
+            # Second batch holds only the last comment and is negative
+            sentiment = "negative" if f"c{BATCH_SIZE}\"" in prompt else "positive"
+            return {
+                "comments": [
+                    {"comment_id": c.comment_id, "sentiment": sentiment}
+                    for c in comments if f"\"{c.comment_id}\"" in prompt
+                ],
+                "summary": {"positive_percentage": 0.0}
+            }
+
+        gemini = Mock(generate_json=AsyncMock(side_effect=generate_json))
+        service = AnalysisService(youtube=mock_youtube_service, gemini=gemini)
+
+        result = await service._analyze_sentiment(
+            comments=comments,
+            video=Mock(title="Test Video", channel_title="Test Channel")
+        )
+
+        assert gemini.generate_json.await_count == 2
+        assert len(result.comments) == BATCH_SIZE + 1
+        assert result.summary.dominant_sentiment == "positive"
+        assert result.summary.negative_percentage == round(100 / (BATCH_SIZE + 1), 1)
+
+    @pytest.mark.asyncio
+    async def test_duplicate_comments_are_classified_once(self, mock_youtube_service):
+        """Test identical comment texts are sent once and share the label"""
+        from types import SimpleNamespace
+
+        comments = [
+            SimpleNamespace(comment_id=f"c{i}", author="User", text=text, like_count=0, reply_count=0)
+            for i, text in enumerate(["First!", "first! ", "How did you film this?"])
+        ]
+
+        async def generate_json(prompt):
+            return {"comments": [
+                {"comment_id": c.comment_id, "primary_category": "other"}
+                for c in comments if f"\"{c.comment_id}\"" in prompt
+            ]}
+
+        gemini = Mock(generate_json=AsyncMock(side_effect=generate_json))
+        service = AnalysisService(youtube=mock_youtube_service, gemini=gemini)
+
+        result = await service._classify_comments(
+            comments=comments,
+            video=Mock(title="Test Video", channel_title="Test Channel")
+        )
+
+        prompt = gemini.generate_json.await_args.args[0]
+        assert "\"c1\"" not in prompt
+        assert {c.comment_id for c in result.comments} == {"c0", "c1", "c2"}
+        assert result.summary.category_counts == {"other": 3}
+
+    def test_labels_are_normalized(self):
+        """Test AI labels are lowercased and shared between comments"""
+        from src.analysis.schemas import CommentSentiment
+
+        first = CommentSentiment(comment_id="c1", sentiment=" Positive", confidence=0.9)
+        second = CommentSentiment(comment_id="c2", sentiment="".join(["posi", "tive"]), confidence=0.9)
+
+        assert first.sentiment == "positive"
+        assert first.sentiment is second.sentiment
+
     @pytest.mark.asyncio
     async def test_analysis_with_cache(
         self,
@@ -132,7 +206,61 @@ class TestAnalysisPipeline:
         mock_redis_client.get = AsyncMock(return_value='{"analysis_id": "analysis123"}')
         cached = await cached_service.get_cached_analysis("analysis123")
         assert cached is not None
-    
+
+    def test_cache_ttl_follows_status(self):
+        """Completed analyses are cached far longer than failed or in-flight ones"""
+        from src.analysis.cached_service import CachedAnalysisService, AnalysisCacheConfig
+
+        config = AnalysisCacheConfig()
+        cached_service = CachedAnalysisService(cache_service=Mock(), ttl_config=config)
+
+        assert cached_service._compute_ttl({"status": "completed"}) == config.completed_ttl
+        assert cached_service._compute_ttl({"status": "failed"}) == config.failed_ttl
+        assert cached_service._compute_ttl({"status": "classifying"}) == config.in_progress_ttl
+
+    @pytest.mark.asyncio
+    async def test_recent_miss_skips_redis(self, mock_redis_client):
+        """A repeated lookup of a missing ID is answered locally until it is cached"""
+        from src.analysis.cached_service import CachedAnalysisService
+        from src.cache import CacheService
+
+        cache = CacheService(mock_redis_client)
+        cache.get = AsyncMock(return_value=None)
+        cache.set = AsyncMock(return_value=True)
+        cached_service = CachedAnalysisService(analysis_service=Mock(), cache_service=cache)
+
+        assert await cached_service.get_cached_analysis("analysis123") is None
+        assert await cached_service.get_cached_analysis("analysis123") is None
+        assert cache.get.await_count == 1
+
+        await cached_service.cache_analysis("analysis123", {"status": "completed"})
+        assert await cached_service.get_cached_analysis("analysis123") == {"status": "completed"}
+
+    @pytest.mark.asyncio
+    async def test_near_expiry_hit_is_served_and_refreshed_once(self, mock_redis_client):
+        """Entries past the soft refresh point are returned and refreshed in the background"""
+        import time
+        from src.analysis.cached_service import CachedAnalysisService
+        from src.cache import CacheService
+
+        cache = CacheService(mock_redis_client)
+        cache.get = AsyncMock(return_value={
+            "v": {"analysis_id": "analysis123"},
+            "cached_at": time.time() - 95,
+            "ttl": 100,
+        })
+        cached_service = CachedAnalysisService(analysis_service=Mock(), cache_service=cache)
+        cached_service._refresh = AsyncMock()
+
+        first = await cached_service.get_cached_analysis("analysis123")
+        cached_service._local.clear()
+        second = await cached_service.get_cached_analysis("analysis123")
+
+        assert first == second == {"analysis_id": "analysis123"}
+        assert len(cached_service._refreshing) == 1
+        await next(iter(cached_service._refreshing.values()))
+        cached_service._refresh.assert_awaited_once_with("analysis123")
+
     @pytest.mark.asyncio
     async def test_analysis_insufficient_comments(
         self,
@@ -220,7 +348,71 @@ class TestAnalysisStorage:
         
         # Verify set was called
         mock_ref.set.assert_called_once()
-    
+
+    @pytest.mark.asyncio
+    async def test_record_completed_analysis(self):
+        """A completed sync analysis is stored and its comments counted"""
+        from src.analysis import router
+        from src.analysis.schemas import AnalysisResponse, VideoInfo
+
+        analysis = AnalysisResponse(
+            analysis_id="a1",
+            video=VideoInfo(
+                video_id="dQw4w9WgXcQ", title="Video", channel_title="Channel",
+                view_count=10, comment_count=5, thumbnail_url=""
+            ),
+            status=AnalysisStatus.COMPLETED,
+            created_at=datetime.now(),
+            comments_analyzed=42
+        )
+
+        with patch.object(router, "_store_analysis", AsyncMock()) as store, \
+                patch.object(router, "_increment_comment_usage", AsyncMock()) as increment:
+            await router._record_analysis("user1", analysis)
+
+        store.assert_awaited_once_with("user1", analysis)
+        increment.assert_awaited_once_with("user1", 42)
+
+    @pytest.mark.asyncio
+    async def test_cached_analysis_excludes_stored_comments(self):
+        """Polls reuse the parent document but comments are never cached"""
+        from src.analysis import router, storage
+
+        router._analysis_docs.clear()
+        db = Mock()
+        db.collection.return_value.document.return_value.get = AsyncMock(return_value=Mock(
+            exists=True, to_dict=lambda: {"analysis_id": "a1", "user_id": "user1"}
+        ))
+        comments = [{"comment_id": "c1", "text": "Great video"}]
+
+        with patch.object(router, "get_async_firestore", return_value=db), \
+                patch.object(storage, "load_stored_comments", AsyncMock(return_value=comments)):
+            for _ in range(2):
+                result = await router.get_analysis("a1", {"uid": "user1"})
+                assert result["stored_comments"] == comments
+
+        db.collection.return_value.document.return_value.get.assert_awaited_once()
+        assert "stored_comments" not in router._analysis_docs.get("a1")
+        router._analysis_docs.clear()
+
+    @pytest.mark.asyncio
+    async def test_failed_store_keeps_result_in_memory(self):
+        """The in-memory result is only dropped once Firestore has it"""
+        import asyncio
+        from src.analysis.background_service import BackgroundAnalysisService
+        from src.analysis.progress import AnalysisJob
+
+        service = BackgroundAnalysisService(youtube=Mock(), gemini=Mock(), db=Mock())
+        job = AnalysisJob("a1", "user1", "dQw4w9WgXcQ")
+
+        for stored, expected in ((False, "result"), (True, None)):
+            job.result = "result"
+            service._store_analysis = AsyncMock(return_value=stored)
+            service._schedule_store(job, Mock())
+            for _ in range(3):
+                await asyncio.sleep(0)
+            assert job.result == expected
+
     @pytest.mark.asyncio
     async def test_retrieve_analysis_history(
         self,
@@ -342,6 +534,75 @@ class TestAnalysisErrorHandling:
         with pytest.raises(RateLimitError):
             await service.analyze(request, "user123", "free")
 
+    def test_google_api_errors_map_to_status(self):
+        """Test Google API errors become HTTP errors with a static detail"""
+        from google.api_core import exceptions as google_exceptions
+        from src.analysis.router import _google_api_error
+
+        error = _google_api_error(google_exceptions.DeadlineExceeded("slow"), "fetch history")
+        assert error.status_code == 504
+        assert error.detail == "Failed to fetch history"
+
+        error = _google_api_error(google_exceptions.NotFound("gone"), "fetch analysis")
+        assert error.status_code == 404
+
+    @pytest.mark.asyncio
+    async def test_concurrent_starts_take_one_credit(self):
+        """A double-click on the same video can't start two paid analyses"""
+        import asyncio
+        from fastapi import HTTPException
+        from src.analysis import router
+        from src.billing.schemas import PlanId, QuotaCheckResult, UsageType
+
+        async def consume(*args):
+            await asyncio.sleep(0)
+            return QuotaCheckResult(
+                allowed=True, usage_type=UsageType.VIDEOS,
+                current=1, limit=3, remaining=2
+            )
+
+        billing = Mock()
+        billing.get_user_subscription = AsyncMock(return_value=Mock(plan_id=PlanId.FREE))
+        billing.try_consume_quota = AsyncMock(side_effect=consume)
+        billing.get_plan.return_value = Mock(comments_per_video=100)
+        request = AnalysisRequest(video_url_or_id="dQw4w9WgXcQ")
+
+        with patch.object(router, "get_background_analysis_service"):
+            results = await asyncio.gather(
+                router.start_analysis(request, {"uid": "user1"}, billing),
+                router.start_analysis(request, {"uid": "user1"}, billing),
+                return_exceptions=True
+            )
+            await asyncio.gather(*router._analysis_tasks, return_exceptions=True)
+
+        assert billing.try_consume_quota.await_count == 1
+        assert sum(isinstance(result, dict) for result in results) == 1
+        assert any(
+            isinstance(result, HTTPException) and result.status_code == 409
+            for result in results
+        )
+
+    @pytest.mark.asyncio
+    async def test_rejected_start_releases_reservation(self):
+        """A 402 leaves the video free for the next request"""
+        from fastapi import HTTPException
+        from src.analysis import router
+        from src.billing.schemas import PlanId, QuotaCheckResult, UsageType
+
+        billing = Mock()
+        billing.get_user_subscription = AsyncMock(return_value=Mock(plan_id=PlanId.FREE))
+        billing.try_consume_quota = AsyncMock(return_value=QuotaCheckResult(
+            allowed=False, usage_type=UsageType.VIDEOS,
+            current=3, limit=3, remaining=0, upgrade_required=True
+        ))
+        request = AnalysisRequest(video_url_or_id="dQw4w9WgXcQ")
+
+        with pytest.raises(HTTPException) as exc_info:
+            await router.start_analysis(request, {"uid": "user2"}, billing)
+
+        assert exc_info.value.status_code == 402
+        assert ("user2", "dQw4w9WgXcQ") not in router._inflight_analyses
+
 
 # ============================================================================
 # Async Job Tests (Pub/Sub)
@@ -363,6 +624,34 @@ class TestAsyncAnalysisJobs:
         # This would require actual Pub/Sub or mocking
         pytest.skip("Requires Pub/Sub - integration test")
     
+    @pytest.mark.asyncio
+    async def test_job_status_stream_follows_document(self):
+        """Status document changes made off the loop reach the progress stream"""
+        import asyncio
+        from src.analysis.watch import watch_document
+        from src.analysis.router import _job_status_update
+        
+        doc_ref = Mock()
+        stream = watch_document(doc_ref, keepalive=1)
+        first = asyncio.create_task(stream.__anext__())
+        await asyncio.sleep(0)
+        
+        # Firestore invokes listeners on its own thread
+        on_snapshot = doc_ref.on_snapshot.call_args.args[0]
+        snapshot = Mock(exists=True, to_dict=lambda: {
+            "status": "processing",
+            "progress": 0.3,
+            "current_step": "Analyzing sentiment",
+        })
+        await asyncio.to_thread(on_snapshot, [snapshot], [], None)
+        
+        update = _job_status_update("job_123", await first)
+        assert update.step == "analyzing_sentiment"
+        assert update.progress == 30
+        
+        await stream.aclose()
+        doc_ref.on_snapshot.return_value.unsubscribe.assert_called_once()
+    
     @pytest.mark.asyncio
     async def test_job_status_tracking(
         self,
@@ -14,6 +14,15 @@ from src.billing.schemas import UsageType, QuotaCheckResult
 from src.billing.enforcement import require_video_quota, require_ai_quota
 
 
+@pytest.fixture(autouse=True)
+def clear_usage_cache():
+    """Keep cached usage from leaking between tests"""
+    from src.billing import service as billing_service
+    billing_service._usage_cache.clear()
+    yield
+    billing_service._usage_cache.clear()
+
+
 # ============================================================================
 # BillingService Tests
 # ============================================================================
@@ -87,6 +96,26 @@ class TestBillingService:
         # Verify Firestore update was called
         mock_ref.update.assert_called_once()
     
+    @pytest.mark.asyncio
+    async def test_increment_usage_bulk_is_one_write(self):
+        """Several counters are incremented in a single update"""
+        from src.billing import service as billing_service
+
+        mock_db = Mock()
+        usage_ref = mock_db.collection.return_value.document.return_value \
+            .collection.return_value.document.return_value
+
+        with patch.object(billing_service, "get_firestore", return_value=mock_db):
+            service = BillingService()
+            with patch.object(service, "get_user_usage", AsyncMock()):
+                await service.increment_usage_bulk("user123", {
+                    UsageType.VIDEOS: 1,
+                    UsageType.COMMENTS: 250,
+                })
+
+        usage_ref.update.assert_called_once()
+        assert set(usage_ref.update.call_args.args[0]) == {"videos_analyzed", "comments_analyzed"}
+    
     @pytest.mark.asyncio
     async def test_get_user_usage(self, mock_firestore, sample_usage_data):
         """Test getting user usage data"""
@@ -120,6 +149,99 @@ class TestBillingService:
         # Verify subscription document was created/updated
         mock_ref.set.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_try_consume_quota_updates_only_when_allowed(self):
+        """The counter moves inside the transaction only if quota remains"""
+        from google.cloud import firestore
+        from src.billing import service as billing_service
+
+        mock_db = Mock()
+        usage_ref = mock_db.collection.return_value.document.return_value \
+            .collection.return_value.document.return_value
+        transaction = mock_db.transaction.return_value
+
+        with patch.object(billing_service, "get_firestore", return_value=mock_db), \
+                patch.object(firestore, "transactional", lambda func: func):
+            service = BillingService()
+
+            usage_ref.get.return_value = Mock(exists=True, to_dict=lambda: {
+                "videos_analyzed": 2, "videos_limit": 3
+            })
+            result = await service.try_consume_quota("user123", UsageType.VIDEOS, 1)
+            assert result.allowed
+            transaction.update.assert_called_once_with(usage_ref, {"videos_analyzed": 3})
+
+            transaction.update.reset_mock()
+            usage_ref.get.return_value = Mock(exists=True, to_dict=lambda: {
+                "videos_analyzed": 3, "videos_limit": 3
+            })
+            result = await service.try_consume_quota("user123", UsageType.VIDEOS, 1)
+            assert not result.allowed
+            transaction.update.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_try_consume_quota_fails_closed(self):
+        """A failed transaction refuses the action instead of running it uncharged"""
+        from google.cloud import firestore
+        from src.billing import service as billing_service
+
+        mock_db = Mock()
+        usage_ref = mock_db.collection.return_value.document.return_value \
+            .collection.return_value.document.return_value
+        usage_ref.get.side_effect = Exception("unavailable")
+
+        with patch.object(billing_service, "get_firestore", return_value=mock_db), \
+                patch.object(firestore, "transactional", lambda func: func):
+            service = BillingService()
+            service.check_quota = AsyncMock()
+            result = await service.try_consume_quota("user123", UsageType.VIDEOS, 1)
+
+        assert not result.allowed
+        assert not result.upgrade_required
+        service.check_quota.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_subscription_is_cached_until_updated(self):
+        """Repeated subscription reads hit Firestore once until an update"""
+        from src.billing import service as billing_service
+
+        billing_service._subscription_cache.clear()
+        mock_db = Mock()
+        sub_ref = mock_db.collection.return_value.document.return_value \
+            .collection.return_value.document.return_value
+        sub_ref.get.return_value = Mock(exists=False)
+
+        with patch.object(billing_service, "get_firestore", return_value=mock_db):
+            service = BillingService()
+            await service.get_user_subscription("user123")
+            await service.get_user_subscription("user123")
+            assert sub_ref.get.call_count == 1
+
+            await service.update_subscription("user123", {"plan_id": "pro"})
+            assert sub_ref.get.call_count == 2
+
+        billing_service._subscription_cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_quota_check_uses_cached_usage_only_when_allowed(self):
+        """Cached usage answers allowed checks; exhausted ones re-read Firestore"""
+        from src.billing import service as billing_service
+        from src.billing.schemas import Usage
+
+        service = BillingService()
+        fresh = Usage(videos_analyzed=0, videos_limit=3)
+
+        with patch.object(service, "get_user_usage", AsyncMock(return_value=fresh)) as get_usage:
+            billing_service._usage_cache.set("user123", Usage(videos_analyzed=1, videos_limit=3))
+            result = await service.check_quota("user123", UsageType.VIDEOS, 1)
+            assert result.allowed and result.current == 1
+            get_usage.assert_not_called()
+
+            billing_service._usage_cache.set("user123", Usage(videos_analyzed=3, videos_limit=3))
+            result = await service.check_quota("user123", UsageType.VIDEOS, 1)
+            assert result.allowed and result.current == 0
+            get_usage.assert_awaited_once_with("user123")
+
 
 # ============================================================================
 # Usage Analytics Tests
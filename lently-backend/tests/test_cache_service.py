@@ -44,6 +44,11 @@ class TestCacheKeys:
         key = CacheKeys.user_quota("user123")
         assert key == "quota:user123"
     
+    def test_gemini_response_key(self):
+        """Test Gemini response key generation"""
+        key = CacheKeys.gemini_response("abc123")
+        assert key == "gemini:abc123"
+    
     def test_analysis_pattern(self):
         """Test analysis pattern for bulk deletion"""
         pattern = CacheKeys.analysis_pattern()
@@ -368,3 +373,112 @@ class TestCacheErrorHandling:
         # Should handle JSON decode error gracefully
         assert result is None
         assert cache.stats["errors"] >= 1
+
+
+# ============================================================================
+# Payload Encoding Tests
+# ============================================================================
+
+@pytest.mark.unit
+class TestCachePayloadEncoding:
+    """Test framed/compressed payload encoding"""
+    
+    def test_small_payload_roundtrip(self):
+        """Small values are stored uncompressed"""
+        from src.cache.service import _encode, _decode
+        
+        value = {"analysis_id": "abc", "count": 3}
+        raw = _encode(value)
+        assert raw[:1] == b"\x00"
+        assert _decode(raw) == value
+    
+    def test_large_payload_is_compressed(self):
+        """Values above the threshold are compressed and still roundtrip"""
+        from src.cache.service import _encode, _decode, COMPRESS_THRESHOLD
+        
+        value = {"comments": [{"text": "great video", "sentiment": "positive"}] * 500}
+        raw = _encode(value)
+        assert raw[:1] == b"\x01"
+        assert len(raw) < COMPRESS_THRESHOLD
+        assert _decode(raw) == value
+    
+    def test_legacy_plain_json_is_readable(self):
+        """Entries written before framing are decoded as plain JSON"""
+        from src.cache.service import _decode
+        
+        assert _decode('{"a": 1}') == {"a": 1}
+        assert _decode(b'[1, 2]') == [1, 2]
+
+
+# ============================================================================
+# Local Cache Tests
+# ============================================================================
+
+@pytest.mark.unit
+class TestLocalTTLCache:
+    """Test in-process TTL cache"""
+    
+    def test_get_returns_stored_value(self):
+        """Stored values are returned until they expire"""
+        from src.cache import LocalTTLCache
+        
+        cache = LocalTTLCache(maxsize=2, ttl=30)
+        cache.set("a", {"x": 1})
+        assert cache.get("a") == {"x": 1}
+        assert cache.get("missing") is None
+    
+    def test_expired_entries_are_dropped(self):
+        """Entries past their TTL are treated as missing"""
+        from src.cache import LocalTTLCache
+        
+        cache = LocalTTLCache(maxsize=2, ttl=0)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+    
+    def test_least_recently_used_is_evicted(self):
+        """When full, the least recently read entry goes first"""
+        from src.cache import LocalTTLCache
+        
+        cache = LocalTTLCache(maxsize=2, ttl=30)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+
+
+# ============================================================================
+# Gemini Response Cache Tests
+# ============================================================================
+
+@pytest.mark.unit
+class TestCachedGeminiClient:
+    """Test exact-prompt caching of Gemini JSON responses"""
+    
+    @pytest.mark.asyncio
+    async def test_same_prompt_calls_gemini_once(self):
+        """A repeated prompt is served from cache"""
+        from src.gemini.cached_client import CachedGeminiClient
+        
+        store = {}
+        cache = Mock()
+        cache.get = AsyncMock(side_effect=lambda key: store.get(key))
+        cache.set = AsyncMock(side_effect=lambda key, value, ttl: store.setdefault(key, value))
+        gemini = Mock(generate_json=AsyncMock(return_value={"comments": []}))
+        
+        client = CachedGeminiClient(gemini, cache)
+        assert await client.generate_json("prompt") == {"comments": []}
+        assert await client.generate_json("prompt") == {"comments": []}
+        await client.generate_json("other prompt")
+        
+        assert gemini.generate_json.await_count == 2
+    
+    def test_fingerprint_covers_system_instruction(self):
+        """Different system instructions never share an entry"""
+        from src.gemini.cached_client import prompt_fingerprint
+        
+        assert prompt_fingerprint("p") == prompt_fingerprint("p")
+        assert prompt_fingerprint("p") != prompt_fingerprint("p", system_instruction="other")
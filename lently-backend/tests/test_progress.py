@@ -0,0 +1,206 @@
+"""
+Unit Tests for Analysis Progress Tracking
+==========================================
+
+Tests step progress calculation and job bookkeeping.
+"""
+
+import asyncio
+
+import pytest
+
+from src.analysis.progress import (
+    AnalysisJob, AnalysisStep, ProgressManager, NOTIFY_INTERVAL, STEP_WEIGHTS
+)
+
+
+# ============================================================================
+# AnalysisJob Tests
+# ============================================================================
+
+class TestAnalysisJobProgress:
+    """Test progress percentage calculation"""
+    
+    def test_progress_is_sum_of_previous_step_weights(self):
+        """Each step reports the weight of all steps before it"""
+        job = AnalysisJob("a1", "u1", "https://youtu.be/x")
+        steps = list(AnalysisStep)
+        
+        for step in steps:
+            if step in (AnalysisStep.COMPLETED, AnalysisStep.FAILED):
+                continue
+            job.step = step
+            expected = sum(
+                weight for s, weight in STEP_WEIGHTS.items()
+                if steps.index(s) < steps.index(step)
+            )
+            assert job.calculate_progress() == min(expected, 97)
+    
+    def test_completed_is_100(self):
+        """Completed jobs always report 100"""
+        job = AnalysisJob("a1", "u1", "https://youtu.be/x")
+        job.update_step(AnalysisStep.COMPLETED)
+        assert job.progress == 100
+        assert job.status == "completed"
+    
+    def test_finished_job_reuses_final_snapshot(self):
+        """Polling a finished job returns the same snapshot object"""
+        job = AnalysisJob("a1", "u1", "https://youtu.be/x")
+        job.update_step(AnalysisStep.COMPLETED)
+        assert job.get_progress() is job.get_progress()
+        assert job.get_progress().progress == 100
+    
+    def test_failed_keeps_last_progress(self):
+        """Failing keeps the progress reached so far"""
+        job = AnalysisJob("a1", "u1", "https://youtu.be/x")
+        job.update_step(AnalysisStep.ANALYZING_SENTIMENT)
+        before = job.progress
+        job.update_step(AnalysisStep.FAILED, error="boom")
+        assert job.progress == before
+        assert job.is_cancelled()
+
+
+# ============================================================================
+# ProgressManager Tests
+# ============================================================================
+
+class TestProgressManager:
+    """Test job registry"""
+    
+    def test_create_and_get_job(self):
+        """Jobs are retrievable by ID and by user"""
+        manager = ProgressManager()
+        job = manager.create_job("a1", "u1", "https://youtu.be/x")
+        
+        assert manager.get_job("a1") is job
+        assert manager.get_user_jobs("u1") == [job]
+        assert manager.get_active_job_for_user("u1") is job
+    
+    def test_finished_job_is_not_active(self):
+        """Completed jobs are not reported as active"""
+        manager = ProgressManager()
+        job = manager.create_job("a1", "u1", "https://youtu.be/x")
+        job.update_step(AnalysisStep.COMPLETED)
+        
+        assert manager.get_active_job_for_user("u1") is None
+
+    def test_cleanup_removes_only_expired_finished_jobs(self):
+        """Cleanup drops finished jobs past max age and leaves running ones"""
+        manager = ProgressManager()
+        done = manager.create_job("a1", "u1", "https://youtu.be/x")
+        running = manager.create_job("a2", "u1", "https://youtu.be/y")
+        done.update_step(AnalysisStep.COMPLETED)
+
+        manager.cleanup_old_jobs(max_age_minutes=30)
+        assert manager.get_job("a1") is done
+
+        manager.cleanup_old_jobs(max_age_minutes=-1)
+        assert manager.get_job("a1") is None
+        assert manager.get_user_jobs("u1") == [running]
+
+    def test_cancelled_job_is_queued_for_cleanup_once(self):
+        """A job is queued for cleanup only on its first terminal transition"""
+        manager = ProgressManager()
+        job = manager.create_job("a1", "u1", "https://youtu.be/x")
+        job.update_step(AnalysisStep.FAILED, error="Cancelled")
+        job.update_step(AnalysisStep.FAILED, error="Cancelled again")
+
+        assert len(manager._finished) == 1
+
+
+# ============================================================================
+# Update Streaming Tests
+# ============================================================================
+
+class TestAnalysisJobUpdates:
+    """Test the latest-snapshot update stream"""
+    
+    @pytest.mark.asyncio
+    async def test_stream_starts_with_current_state(self):
+        """Listeners get the current snapshot straight away"""
+        job = AnalysisJob("a1", "u1", "https://youtu.be/x")
+        job.update_step(AnalysisStep.FETCHING_COMMENTS)
+        
+        stream = job.updates(keepalive=0.01)
+        first = await stream.__anext__()
+        assert first.step == AnalysisStep.FETCHING_COMMENTS.value
+        await stream.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_slow_listener_skips_to_latest(self):
+        """Several updates between reads collapse into the newest one"""
+        job = AnalysisJob("a1", "u1", "https://youtu.be/x")
+        stream = job.updates(keepalive=0.01)
+        await stream.__anext__()
+        
+        job.update_step(AnalysisStep.CONNECTING)
+        job.update_step(AnalysisStep.FETCHING_VIDEO)
+        job.update_step(AnalysisStep.COMPLETED)
+        
+        latest = await stream.__anext__()
+        assert latest.step == AnalysisStep.COMPLETED.value
+        await stream.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_keepalive_when_idle(self):
+        """None is yielded when nothing changes within the keepalive window"""
+        job = AnalysisJob("a1", "u1", "https://youtu.be/x")
+        stream = job.updates(keepalive=0.01)
+        await stream.__anext__()
+        
+        assert await stream.__anext__() is None
+        await stream.aclose()
+    
+    @pytest.mark.asyncio
+    async def test_unchanged_update_is_ignored(self):
+        """Repeating the same step with the same data publishes nothing"""
+        job = AnalysisJob("a1", "u1", "https://youtu.be/x")
+        job.update_step(AnalysisStep.FETCHING_COMMENTS, comments_fetched=10)
+        version = job._version
+        
+        job.update_step(AnalysisStep.FETCHING_COMMENTS, comments_fetched=10)
+        assert job._version == version
+    
+    @pytest.mark.asyncio
+    async def test_chatty_updates_are_coalesced(self):
+        """Bursts of updates publish once now and once after the interval"""
+        job = AnalysisJob("a1", "u1", "https://youtu.be/x")
+        job.update_step(AnalysisStep.FETCHING_COMMENTS, comments_fetched=1)
+        version = job._version
+        
+        for fetched in range(2, 10):
+            job.update_step(AnalysisStep.FETCHING_COMMENTS, comments_fetched=fetched)
+        assert job._version == version
+        
+        await asyncio.sleep(NOTIFY_INTERVAL * 2)
+        assert job._version == version + 1
+        assert job.get_current_update().comments_fetched == 9
+
+    @pytest.mark.asyncio
+    async def test_update_from_worker_thread_is_published_on_loop(self):
+        """Updates made off the loop thread still reach listeners"""
+        job = AnalysisJob("a1", "u1", "https://youtu.be/x")
+        stream = job.updates(keepalive=1)
+        await stream.__anext__()
+
+        await asyncio.to_thread(job.update_step, AnalysisStep.COMPLETED)
+
+        latest = await stream.__anext__()
+        assert latest.step == AnalysisStep.COMPLETED.value
+        await stream.aclose()
+
+    @pytest.mark.asyncio
+    async def test_update_before_wait_starts_is_not_missed(self):
+        """A publish landing before the listener's wait begins still wakes it"""
+        job = AnalysisJob("a1", "u1", "https://youtu.be/x")
+        stream = job.updates(keepalive=5)
+        await stream.__anext__()
+
+        # The listener is suspended in wait_for, whose inner wait hasn't run yet
+        pending = asyncio.create_task(stream.__anext__())
+        await asyncio.sleep(0)
+        job.update_step(AnalysisStep.COMPLETED)
+
+        latest = await asyncio.wait_for(pending, timeout=1)
+        assert latest.step == AnalysisStep.COMPLETED.value
+        await stream.aclose()